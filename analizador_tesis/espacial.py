@@ -15,7 +15,7 @@ Autor: Sistema de Análisis de Tesis
 import numpy as np
 import pandas as pd
 from scipy import ndimage, stats
-from sklearn.cluster import KMeans, DBSCAN
+from sklearn.cluster import KMeans, MiniBatchKMeans, DBSCAN
 from sklearn.preprocessing import StandardScaler
 import warnings
 
@@ -213,14 +213,18 @@ def etiquetar_regiones(mascara):
 # CLUSTERING ESPACIAL
 # ============================================================================
 
-def clustering_kmeans(imagen, n_clusters=5, incluir_coords=True):
+def clustering_kmeans(imagen, n_clusters=5, incluir_coords=True, umbral_minibatch=100_000):
     """
     Aplica K-means clustering a la imagen.
     
+    NOTA: Con imágenes grandes (más de `umbral_minibatch` píxeles válidos) se usa
+    MiniBatchKMeans, mucho más rápido y con etiquetas prácticamente iguales.
+    
     Args:
         imagen: Array 2D con datos
         n_clusters: Número de clusters
         incluir_coords: Si incluir coordenadas espaciales como features
+        umbral_minibatch: Píxeles válidos a partir de los cuales usar MiniBatchKMeans
         
     Returns:
         dict con etiquetas de clusters y estadísticas
@@ -248,7 +252,11 @@ def clustering_kmeans(imagen, n_clusters=5, incluir_coords=True):
     features_norm = scaler.fit_transform(features)
     
     # Aplicar K-means
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    if len(valores) > umbral_minibatch:
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, batch_size=8192,
+                                 n_init=3, max_iter=100)
+    else:
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
     etiquetas_1d = kmeans.fit_predict(features_norm)
     
     # Reconstruir imagen de clusters
@@ -256,19 +264,17 @@ def clustering_kmeans(imagen, n_clusters=5, incluir_coords=True):
     clusters_2d[indices_y, indices_x] = etiquetas_1d
     
     # Calcular estadísticas por cluster
+    stats = calcular_estadisticas_por_zona(valores, etiquetas_1d, n_clusters)
     stats_clusters = []
     for i in range(n_clusters):
-        mascara_cluster = (etiquetas_1d == i)
-        valores_cluster = valores[mascara_cluster]
-        
         stats_clusters.append({
             'cluster': i,
-            'n_pixeles': int(np.sum(mascara_cluster)),
-            'porcentaje': float(np.sum(mascara_cluster) / len(valores) * 100),
-            'media': float(np.mean(valores_cluster)),
-            'std': float(np.std(valores_cluster)),
-            'min': float(np.min(valores_cluster)),
-            'max': float(np.max(valores_cluster))
+            'n_pixeles': int(stats['n_pixeles'][i]),
+            'porcentaje': float(stats['n_pixeles'][i] / len(valores) * 100),
+            'media': float(stats['media'][i]),
+            'std': float(stats['std'][i]),
+            'min': float(stats['min'][i]),
+            'max': float(stats['max'][i])
         })
     
     # Ordenar clusters por media (de menor a mayor)
@@ -549,6 +555,56 @@ def calcular_velocidad_espacial(imagen1, imagen2, dias):
 # ESTADÍSTICAS POR REGIONES
 # ============================================================================
 
+def calcular_estadisticas_por_zona(valores, etiquetas, n_zonas):
+    """
+    Calcula n, media, std, min y max de cada zona en una sola pasada ordenada.
+
+    Ordena los valores por etiqueta y reduce cada grupo contiguo con
+    `reduceat`, en lugar de recorrer el array completo una vez por zona.
+
+    Args:
+        valores: Array 1D con valores válidos (sin NaN)
+        etiquetas: Array 1D de enteros en [0, n_zonas) con la zona de cada valor
+        n_zonas: Número total de zonas
+
+    Returns:
+        dict de arrays de longitud n_zonas: 'n_pixeles', 'media', 'std',
+        'min', 'max' (NaN en zonas sin píxeles)
+    """
+    etiquetas = np.asarray(etiquetas, dtype=np.intp)
+    valores = np.asarray(valores, dtype=np.float64)
+
+    resultado = {
+        'n_pixeles': np.bincount(etiquetas, minlength=n_zonas)[:n_zonas],
+        'media': np.full(n_zonas, np.nan),
+        'std': np.full(n_zonas, np.nan),
+        'min': np.full(n_zonas, np.nan),
+        'max': np.full(n_zonas, np.nan)
+    }
+
+    if len(valores) == 0:
+        return resultado
+
+    orden = np.argsort(etiquetas, kind='stable')
+    etiquetas_ord = etiquetas[orden]
+    valores_ord = valores[orden]
+
+    # Inicio de cada grupo y zona a la que corresponde
+    inicios = np.flatnonzero(np.diff(etiquetas_ord, prepend=-1))
+    zonas = etiquetas_ord[inicios]
+    n = resultado['n_pixeles'][zonas]
+
+    medias = np.add.reduceat(valores_ord, inicios) / n
+    desv = valores_ord - np.repeat(medias, n)
+
+    resultado['media'][zonas] = medias
+    resultado['std'][zonas] = np.sqrt(np.add.reduceat(desv * desv, inicios) / n)
+    resultado['min'][zonas] = np.minimum.reduceat(valores_ord, inicios)
+    resultado['max'][zonas] = np.maximum.reduceat(valores_ord, inicios)
+
+    return resultado
+
+
 def dividir_en_cuadrantes(imagen, n_filas=2, n_cols=2):
     """
     Divide la imagen en cuadrantes y calcula estadísticas.
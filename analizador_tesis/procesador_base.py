@@ -108,6 +108,36 @@ def cargar_csv_pixeles(ruta_csv, filtrar_ceros=True, filtrar_shapefile=False, ru
         raise IOError(f"Error al leer CSV {ruta_csv}: {e}")
 
 
+def cargar_valores_csv(ruta_csv, filtrar_ceros=True):
+    """
+    Carga solo la columna de valores de un CSV de píxeles.
+    
+    Para estadísticas no hacen falta longitude/latitude: se parsea una sola
+    columna (la del índice, igual que la 'valor' de cargar_csv_pixeles).
+    
+    Args:
+        ruta_csv (str o Path): Ruta al archivo CSV de píxeles
+        filtrar_ceros (bool): Si True, elimina píxeles con valor = 0
+    
+    Returns:
+        numpy.ndarray: Valores del índice
+    """
+    try:
+        import pandas as pd
+        columnas = pd.read_csv(ruta_csv, nrows=0).columns
+        columna = columnas[2] if len(columnas) == 3 else 'valor'
+        valores = pd.read_csv(ruta_csv, usecols=[columna])[columna].to_numpy()
+        
+        # Eliminar valores en cero (fuera del área o inválidos)
+        if filtrar_ceros:
+            valores = valores[valores != 0]
+        
+        return valores
+        
+    except Exception as e:
+        raise IOError(f"Error al leer CSV {ruta_csv}: {e}")
+
+
 def cargar_datos_optimizado(info_imagen, usar_csv=True, filtrar_ceros=True):
     """
     Carga datos de forma optimizada: primero intenta CSV, si no existe usa TIFF.
@@ -127,9 +157,8 @@ def cargar_datos_optimizado(info_imagen, usar_csv=True, filtrar_ceros=True):
     # Intentar usar CSV si está disponible
     if usar_csv and info_imagen.get('csv_pixeles') and info_imagen['csv_pixeles'].exists():
         try:
-            df = cargar_csv_pixeles(info_imagen['csv_pixeles'], filtrar_ceros=filtrar_ceros)
-            # Retornar solo valores como array numpy
-            valores = df['valor'].values
+            # Solo se necesitan los valores (sin coordenadas)
+            valores = cargar_valores_csv(info_imagen['csv_pixeles'], filtrar_ceros=filtrar_ceros)
             return valores, 'csv'
         except Exception as e:
             warnings.warn(f"Error al leer CSV, usando TIFF: {e}")
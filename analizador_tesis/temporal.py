@@ -114,6 +114,107 @@ def calcular_tendencia_lineal(df, columna_fecha='fecha', columna_valor='media'):
     }
 
 
+def calcular_tendencias_lineales(fechas, series):
+    """
+    Calcula la tendencia lineal de varias series que comparten el eje de fechas.
+
+    Equivale a llamar calcular_tendencia_lineal() para cada fila de `series`,
+    pero resuelve todas las regresiones a la vez con fórmulas cerradas de OLS.
+
+    Args:
+        fechas: Secuencia de fechas (longitud T)
+        series: Array 2D (n_series, T) con valores; NaN se ignora por serie
+
+    Returns:
+        list: Un dict por serie (mismas claves que calcular_tendencia_lineal)
+              o None si la serie tiene menos de 2 puntos válidos
+    """
+    fechas = pd.to_datetime(pd.Series(list(fechas)), errors='coerce')
+    Y = np.atleast_2d(np.asarray(series, dtype=np.float64))
+
+    # Ordenar por fecha y descartar fechas inválidas
+    orden = np.argsort(fechas.values, kind='stable')
+    fechas = fechas.iloc[orden]
+    Y = Y[:, orden]
+    fecha_valida = fechas.notna().values
+
+    if not fecha_valida.any():
+        return [None] * len(Y)
+
+    # Días desde la primera fecha
+    x = (fechas - fechas.min()).dt.days.fillna(0).values.astype(np.float64)
+
+    validos = ~np.isnan(Y) & fecha_valida
+    n = validos.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_x = np.where(validos, x, 0).sum(axis=1) / n
+        media_y = np.where(validos, Y, 0).sum(axis=1) / n
+        dx = np.where(validos, x - media_x[:, None], 0)
+        dy = np.where(validos, Y - media_y[:, None], 0)
+
+        sxx = np.einsum('ij,ij->i', dx, dx)
+        sxy = np.einsum('ij,ij->i', dx, dy)
+        syy = np.einsum('ij,ij->i', dy, dy)
+
+        pendiente = sxy / sxx
+        intercepto = media_y - pendiente * media_x
+        r = np.where((sxx > 0) & (syy > 0), sxy / np.sqrt(sxx * syy), 0.0)
+        r = np.clip(r, -1.0, 1.0)
+
+        # p-valor y error estándar (mismas fórmulas que scipy.stats.linregress)
+        gl = n - 2
+        t = r * np.sqrt(gl / ((1.0 - r) * (1.0 + r) + 1e-20))
+        p_valor = 2 * stats.t.sf(np.abs(t), gl)
+        error_std = np.sqrt((1 - r ** 2) * syy / sxx / gl)
+
+    x_min = np.where(validos, x, np.inf).min(axis=1)
+    x_max = np.where(validos, x, -np.inf).max(axis=1)
+
+    resultados = []
+    for i in range(len(Y)):
+        if n[i] < 2 or sxx[i] == 0:
+            resultados.append(None)
+            continue
+
+        if n[i] == 2:
+            p_valor[i] = 1.0 if syy[i] == 0 else 0.0
+            error_std[i] = 0.0
+
+        slope = pendiente[i]
+        valor_inicial = intercepto[i]
+        valor_final = slope * x_max[i] + intercepto[i]
+        cambio_absoluto = valor_final - valor_inicial
+        cambio_porcentual = (cambio_absoluto / abs(valor_inicial) * 100) if valor_inicial != 0 else None
+
+        # Clasificación de tendencia
+        if p_valor[i] < 0.05:
+            if slope > 0:
+                tendencia = "CRECIENTE (significativa)"
+            else:
+                tendencia = "DECRECIENTE (significativa)"
+        else:
+            tendencia = "SIN TENDENCIA (no significativa)"
+
+        resultados.append({
+            'pendiente': float(slope),
+            'intercepto': float(intercepto[i]),
+            'r2': float(r[i] ** 2),
+            'p_valor': float(p_valor[i]),
+            'error_std': float(error_std[i]),
+            'significativo': bool(p_valor[i] < 0.05),
+            'tendencia': tendencia,
+            'cambio_absoluto': float(cambio_absoluto),
+            'cambio_porcentual': float(cambio_porcentual) if cambio_porcentual is not None else None,
+            'valor_inicial_estimado': float(valor_inicial),
+            'valor_final_estimado': float(valor_final),
+            'n_puntos': int(n[i]),
+            'dias_total': int(x_max[i] - x_min[i])
+        })
+
+    return resultados
+
+
 def test_mann_kendall(serie_temporal):
     """
     Test de Mann-Kendall para detectar tendencias monotónicas.
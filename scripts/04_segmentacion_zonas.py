@@ -13,11 +13,14 @@ ANÁLISIS CLAVE PARA IDENTIFICAR HETEROGENEIDAD ESPACIAL
 """
 
 import sys
+import io
 from pathlib import Path
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import warnings
+import matplotlib
+matplotlib.use('Agg')  # Solo se exportan PNG, no se necesita interfaz gráfica
 
 # Agregar rutas para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
@@ -31,10 +34,11 @@ from analizador_tesis.espacial import (
     clustering_kmeans,
     dividir_en_cuadrantes,
     detectar_hotspots,
-    calcular_estadisticas_espaciales
+    calcular_estadisticas_espaciales,
+    calcular_estadisticas_por_zona
 )
 from analizador_tesis.temporal import (
-    calcular_tendencia_lineal,
+    calcular_tendencias_lineales,
     test_mann_kendall
 )
 from analizador_tesis.estadisticas import calcular_estadisticas_basicas
@@ -58,13 +62,41 @@ warnings.filterwarnings('ignore')
 # FUNCIONES DE SEGMENTACIÓN
 # ============================================================================
 
-def segmentar_por_clustering(imagenes_datos, n_zonas=5):
+def calcular_imagen_promedio(imagenes_datos):
+    """
+    Calcula la imagen promedio temporal ignorando NaN, en una sola pasada.
+    
+    NOTA: np.nanmean(lista, axis=0) primero apila todas las fechas en un cubo
+    (T, alto, ancho) y luego crea temporales del mismo tamaño. Aquí solo se
+    acumulan suma y conteo por píxel, imagen por imagen.
+    
+    Args:
+        imagenes_datos: Lista de arrays 2D (una por fecha)
+        
+    Returns:
+        Array 2D con la media por píxel (NaN donde nunca hubo datos)
+    """
+    suma = np.zeros(imagenes_datos[0].shape)
+    conteo = np.zeros(imagenes_datos[0].shape, dtype=np.int32)
+    
+    for datos in imagenes_datos:
+        validos = ~np.isnan(datos)
+        np.add(suma, datos, out=suma, where=validos)
+        conteo += validos
+    
+    promedio = np.full(suma.shape, np.nan)
+    np.divide(suma, conteo, out=promedio, where=conteo > 0)
+    return promedio.astype(imagenes_datos[0].dtype, copy=False)
+
+
+def segmentar_por_clustering(imagenes_datos, n_zonas=5, imagen_promedio=None):
     """
     Segmenta el área usando clustering K-means sobre la imagen promedio.
     
     Args:
         imagenes_datos: Lista de arrays 2D (una por fecha)
         n_zonas: Número de zonas a identificar
+        imagen_promedio: Imagen promedio ya calculada (opcional)
         
     Returns:
         dict con máscara de zonas y estadísticas
@@ -75,7 +107,8 @@ def segmentar_por_clustering(imagenes_datos, n_zonas=5):
     
     # Calcular imagen promedio
     print("\n[1] Calculando imagen promedio temporal...")
-    imagen_promedio = np.nanmean(imagenes_datos, axis=0)
+    if imagen_promedio is None:
+        imagen_promedio = calcular_imagen_promedio(imagenes_datos)
     n_validos = np.sum(~np.isnan(imagen_promedio))
     print(f"   ✓ Píxeles válidos: {n_validos}")
     
@@ -87,19 +120,17 @@ def segmentar_por_clustering(imagenes_datos, n_zonas=5):
         print("   ERROR: Error en clustering")
         return None
     
-    # Crear máscara de zonas (reordenar por media)
-    mascara_zonas = resultado_cluster['clusters_2d'].copy()
-    
-    # Mapear clusters a zonas (0=más bajo, n_zonas-1=más alto)
-    cluster_a_zona = {}
+    # Mapear clusters a zonas (0=más bajo, n_zonas-1=más alto) con una tabla
+    # de consulta; la última entrada de la tabla es -1 para píxeles sin datos
+    clusters_2d = resultado_cluster['clusters_2d']
+    valid_mask = ~np.isnan(clusters_2d)
+    lut = np.full(n_zonas + 1, -1, dtype=np.int16)
     for i, cluster_info in enumerate(resultado_cluster['stats_clusters']):
-        cluster_a_zona[cluster_info['cluster']] = i
-    
-    # Aplicar mapeo
-    mascara_zonas_ordenada = np.full_like(mascara_zonas, np.nan)
-    for cluster_id, zona_id in cluster_a_zona.items():
-        mascara = (resultado_cluster['clusters_2d'] == cluster_id)
-        mascara_zonas_ordenada[mascara] = zona_id
+        lut[cluster_info['cluster']] = i
+
+    # Aplicar mapeo en una sola pasada
+    indices_lut = np.where(valid_mask, clusters_2d, n_zonas).astype(np.intp)
+    mascara_zonas_ordenada = np.take(lut, indices_lut)
     
     print("\n[3] Estadísticas de zonas:")
     for i, cluster_info in enumerate(resultado_cluster['stats_clusters']):
@@ -110,6 +141,7 @@ def segmentar_por_clustering(imagenes_datos, n_zonas=5):
         'metodo': 'clustering',
         'n_zonas': n_zonas,
         'mascara_zonas': mascara_zonas_ordenada,
+        'valid_mask': valid_mask,
         'stats_zonas': resultado_cluster['stats_clusters'],
         'imagen_promedio': imagen_promedio
     }
@@ -132,9 +164,10 @@ def segmentar_por_cuadrantes(imagen_referencia, n_filas=3, n_cols=3):
     print(f"{'='*80}")
     
     filas, cols = imagen_referencia.shape
+    valid_mask = ~np.isnan(imagen_referencia)
     
-    # Crear máscara de zonas
-    mascara_zonas = np.full((filas, cols), np.nan)
+    # Crear máscara de zonas (-1 = sin datos)
+    mascara_zonas = np.full((filas, cols), -1, dtype=np.int16)
     
     alto_cuadrante = filas // n_filas
     ancho_cuadrante = cols // n_cols
@@ -162,7 +195,7 @@ def segmentar_por_cuadrantes(imagen_referencia, n_filas=3, n_cols=3):
                 stats_zonas.append({
                     'cluster': zona_id,
                     'n_pixeles': len(valores),
-                    'porcentaje': len(valores) / np.sum(~np.isnan(imagen_referencia)) * 100,
+                    'porcentaje': len(valores) / np.sum(valid_mask) * 100,
                     'media': float(np.mean(valores)),
                     'std': float(np.std(valores)),
                     'min': float(np.min(valores)),
@@ -173,8 +206,8 @@ def segmentar_por_cuadrantes(imagen_referencia, n_filas=3, n_cols=3):
             
             zona_id += 1
     
-    # Restaurar NaN donde no hay datos
-    mascara_zonas[np.isnan(imagen_referencia)] = np.nan
+    # Marcar píxeles sin datos
+    mascara_zonas[~valid_mask] = -1
     
     return {
         'metodo': 'cuadrantes',
@@ -182,6 +215,7 @@ def segmentar_por_cuadrantes(imagen_referencia, n_filas=3, n_cols=3):
         'n_filas': n_filas,
         'n_cols': n_cols,
         'mascara_zonas': mascara_zonas,
+        'valid_mask': valid_mask,
         'stats_zonas': stats_zonas
     }
 
@@ -201,8 +235,9 @@ def segmentar_por_percentiles(imagen_referencia, n_zonas=5):
     print(f"SEGMENTACIÓN POR PERCENTILES ({n_zonas} zonas)")
     print(f"{'='*80}")
     
-    # Calcular percentiles
-    valores = imagen_referencia[~np.isnan(imagen_referencia)]
+    # Calcular percentiles (sobre los píxeles válidos, calculados una sola vez)
+    valid_mask = ~np.isnan(imagen_referencia)
+    valores = imagen_referencia[valid_mask]
     percentiles = np.linspace(0, 100, n_zonas + 1)
     limites = np.percentile(valores, percentiles)
     
@@ -210,29 +245,26 @@ def segmentar_por_percentiles(imagen_referencia, n_zonas=5):
     for i in range(n_zonas):
         print(f"   • Zona {i}: [{limites[i]:.4f}, {limites[i+1]:.4f}]")
     
-    # Crear máscara de zonas
-    mascara_zonas = np.full_like(imagen_referencia, np.nan)
+    # Asignar zona a cada valor: [limite_i, limite_i+1), la última incluye el máximo
+    zonas = np.searchsorted(limites[1:-1], valores, side='right').astype(np.int16)
+    
+    # Crear máscara de zonas (-1 = sin datos)
+    mascara_zonas = np.full(imagen_referencia.shape, -1, dtype=np.int16)
+    mascara_zonas[valid_mask] = zonas
     stats_zonas = []
     
+    # Estadísticas de todas las zonas en una sola pasada
+    stats = calcular_estadisticas_por_zona(valores, zonas, n_zonas)
+    
     for i in range(n_zonas):
-        if i == n_zonas - 1:
-            # Última zona incluye el máximo
-            mascara = (imagen_referencia >= limites[i]) & (imagen_referencia <= limites[i+1])
-        else:
-            mascara = (imagen_referencia >= limites[i]) & (imagen_referencia < limites[i+1])
-        
-        mascara_zonas[mascara] = i
-        
-        valores_zona = imagen_referencia[mascara]
-        
         stats_zonas.append({
             'cluster': i,
-            'n_pixeles': int(np.sum(mascara)),
-            'porcentaje': float(np.sum(mascara) / len(valores) * 100),
-            'media': float(np.mean(valores_zona)),
-            'std': float(np.std(valores_zona)),
-            'min': float(np.min(valores_zona)),
-            'max': float(np.max(valores_zona)),
+            'n_pixeles': int(stats['n_pixeles'][i]),
+            'porcentaje': float(stats['n_pixeles'][i] / len(valores) * 100),
+            'media': float(stats['media'][i]),
+            'std': float(stats['std'][i]),
+            'min': float(stats['min'][i]),
+            'max': float(stats['max'][i]),
             'limite_inferior': float(limites[i]),
             'limite_superior': float(limites[i+1])
         })
@@ -241,6 +273,7 @@ def segmentar_por_percentiles(imagen_referencia, n_zonas=5):
         'metodo': 'percentiles',
         'n_zonas': n_zonas,
         'mascara_zonas': mascara_zonas,
+        'valid_mask': valid_mask,
         'stats_zonas': stats_zonas,
         'limites': limites
     }
@@ -250,12 +283,13 @@ def segmentar_por_percentiles(imagen_referencia, n_zonas=5):
 # ANÁLISIS TEMPORAL POR ZONA
 # ============================================================================
 
-def analizar_evolucion_zonas(mascara_zonas, imagenes_info, indice):
+def analizar_evolucion_zonas(mascara_zonas, valid_mask, imagenes_info, indice):
     """
     Analiza la evolución temporal de cada zona.
     
     Args:
-        mascara_zonas: Array 2D con IDs de zonas
+        mascara_zonas: Array 2D (int16) con IDs de zonas
+        valid_mask: Array 2D booleano con los píxeles que tienen zona
         imagenes_info: Lista de diccionarios con info de imágenes
         indice: Nombre del índice
         
@@ -266,16 +300,19 @@ def analizar_evolucion_zonas(mascara_zonas, imagenes_info, indice):
     print("ANÁLISIS TEMPORAL POR ZONA")
     print(f"{'='*80}")
     
-    n_zonas = int(np.nanmax(mascara_zonas)) + 1
+    n_zonas = int(mascara_zonas[valid_mask].max()) + 1
     
-    # Inicializar estructuras
-    series_zonas = {i: [] for i in range(n_zonas)}
+    # Inicializar estructuras: matriz (n_zonas, T) de medias y conteos
+    n_fechas = len(imagenes_info)
+    medias = np.full((n_zonas, n_fechas), np.nan)
+    conteos = np.zeros((n_zonas, n_fechas), dtype=np.int64)
     fechas = []
+    fechas_str = []
     
-    print(f"\n📅 Procesando {len(imagenes_info)} fechas...")
+    print(f"\n📅 Procesando {n_fechas} fechas...")
     
     # Procesar cada fecha
-    for img_info in imagenes_info:
+    for t, img_info in enumerate(imagenes_info):
         fecha_str = img_info['fecha_str'] or img_info['carpeta']
         fecha = img_info['fecha']
         
@@ -283,23 +320,14 @@ def analizar_evolucion_zonas(mascara_zonas, imagenes_info, indice):
         datos = cargar_imagen_enmascarada(img_info['ruta'], RUTA_SHAPEFILE)
         
         fechas.append(fecha)
+        fechas_str.append(fecha_str)
         
-        # Calcular estadísticas por zona
-        for zona_id in range(n_zonas):
-            mascara_zona = (mascara_zonas == zona_id)
-            valores_zona = datos[mascara_zona & ~np.isnan(datos)]
-            
-            if len(valores_zona) > 0:
-                media = float(np.mean(valores_zona))
-            else:
-                media = np.nan
-            
-            series_zonas[zona_id].append({
-                'fecha': fecha,
-                'fecha_str': fecha_str,
-                'media': media,
-                'n_pixeles': len(valores_zona)
-            })
+        # Calcular media por zona en una sola pasada (bincount)
+        validos = valid_mask & ~np.isnan(datos)
+        zonas = mascara_zonas[validos]
+        sumas = np.bincount(zonas, weights=datos[validos], minlength=n_zonas)
+        conteos[:, t] = np.bincount(zonas, minlength=n_zonas)
+        np.divide(sumas, conteos[:, t], out=medias[:, t], where=conteos[:, t] > 0)
     
     print(f"   ✓ Procesadas {len(fechas)} fechas")
     
@@ -307,15 +335,23 @@ def analizar_evolucion_zonas(mascara_zonas, imagenes_info, indice):
     print(f"\nGenerando tendencias por zona...")
     resultados_zonas = {}
     
+    # Tendencias de todas las zonas con una sola regresión vectorizada
+    if n_fechas > 3:  # Mínimo para tendencia
+        tendencias = calcular_tendencias_lineales(fechas, medias)
+    
     for zona_id in range(n_zonas):
-        df_zona = pd.DataFrame(series_zonas[zona_id])
+        df_zona = pd.DataFrame({
+            'fecha': fechas,
+            'fecha_str': fechas_str,
+            'media': medias[zona_id],
+            'n_pixeles': conteos[zona_id]
+        })
         
-        if len(df_zona) > 3:  # Mínimo para tendencia
-            # Calcular tendencia
-            tendencia = calcular_tendencia_lineal(df_zona, 'fecha', 'media')
+        if n_fechas > 3:
+            tendencia = tendencias[zona_id]
             
             # Test Mann-Kendall
-            mk = test_mann_kendall(df_zona['media'].values)
+            mk = test_mann_kendall(medias[zona_id])
             
             resultados_zonas[zona_id] = {
                 'df': df_zona,
@@ -401,7 +437,7 @@ def comparar_zonas(resultados_zonas):
 # FUNCIÓN PRINCIPAL DE SEGMENTACIÓN
 # ============================================================================
 
-def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
+def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5, formato='csv'):
     """
     Realiza segmentación y análisis por zonas de un índice.
     
@@ -409,6 +445,7 @@ def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
         indice: Nombre del índice
         metodo: 'clustering', 'cuadrantes', o 'percentiles'
         n_zonas: Número de zonas (depende del método)
+        formato: Formato de los reportes ('csv' o 'parquet')
     """
     print(f"\n{'#'*80}")
     print(f"# SEGMENTACIÓN DE ZONAS: {indice}")
@@ -434,7 +471,8 @@ def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
         fecha_str = img_info['fecha_str'] or img_info['carpeta']
         print(f"   [{i}/{len(imagenes)}] {fecha_str}... ", end='', flush=True)
         try:
-            datos = cargar_imagen_enmascarada(img_info['ruta'], RUTA_SHAPEFILE)
+            # float32 es suficiente para índices de vegetación y usa la mitad de memoria
+            datos = cargar_imagen_enmascarada(img_info['ruta'], RUTA_SHAPEFILE).astype(np.float32, copy=False)
             imagenes_datos.append(datos)
             print("✓")
         except Exception as e:
@@ -446,12 +484,14 @@ def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
     
     print(f"\nCargadas {len(imagenes_datos)} imágenes")
     
+    # Imagen promedio (referencia común para todos los métodos)
+    imagen_ref = calcular_imagen_promedio(imagenes_datos)
+    
     # Realizar segmentación
     if metodo == 'clustering':
-        segmentacion = segmentar_por_clustering(imagenes_datos, n_zonas=n_zonas)
+        segmentacion = segmentar_por_clustering(imagenes_datos, n_zonas=n_zonas, imagen_promedio=imagen_ref)
     elif metodo == 'cuadrantes':
         # Usar imagen promedio como referencia
-        imagen_ref = np.nanmean(imagenes_datos, axis=0)
         if n_zonas == 4:
             segmentacion = segmentar_por_cuadrantes(imagen_ref, n_filas=2, n_cols=2)
         elif n_zonas == 9:
@@ -462,7 +502,6 @@ def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
             n_cols = int(np.ceil(n_zonas / n_filas))
             segmentacion = segmentar_por_cuadrantes(imagen_ref, n_filas=n_filas, n_cols=n_cols)
     elif metodo == 'percentiles':
-        imagen_ref = np.nanmean(imagenes_datos, axis=0)
         segmentacion = segmentar_por_percentiles(imagen_ref, n_zonas=n_zonas)
     else:
         print(f"\nERROR: Método '{metodo}' no reconocido")
@@ -475,6 +514,7 @@ def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
     # Análisis temporal por zona
     resultados_zonas = analizar_evolucion_zonas(
         segmentacion['mascara_zonas'],
+        segmentacion['valid_mask'],
         imagenes,
         indice
     )
@@ -483,7 +523,8 @@ def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
     df_comparacion = comparar_zonas(resultados_zonas)
     
     # Guardar resultados
-    guardar_reportes_segmentacion(indice, metodo, segmentacion, resultados_zonas, df_comparacion)
+    guardar_reportes_segmentacion(indice, metodo, segmentacion, resultados_zonas, df_comparacion,
+                                  formato=formato)
     
     # Generar visualizaciones
     generar_visualizaciones_segmentacion(indice, metodo, segmentacion, resultados_zonas)
@@ -501,12 +542,35 @@ def analizar_segmentacion_indice(indice, metodo='clustering', n_zonas=5):
 # GUARDAR REPORTES
 # ============================================================================
 
-def guardar_reportes_segmentacion(indice, metodo, segmentacion, resultados_zonas, df_comparacion):
+def _guardar_tabla(df, archivo, formato='csv'):
+    """
+    Escribe un DataFrame en CSV o parquet y retorna la ruta final.
+    
+    NOTA: parquet (pyarrow) escribe mucho más rápido y ocupa menos, pero el
+    reporte PDF lee los CSVs, por eso CSV sigue siendo el formato por defecto.
+    """
+    if formato == 'parquet':
+        archivo = archivo.with_suffix('.parquet')
+        df.to_parquet(archivo, engine='pyarrow', compression='snappy', index=False)
+    else:
+        df.to_csv(archivo, index=False)
+    return archivo
+
+
+def guardar_reportes_segmentacion(indice, metodo, segmentacion, resultados_zonas, df_comparacion,
+                                  formato='csv'):
     """
     Guarda reportes de segmentación.
+    
+    Args:
+        formato: 'csv' (un archivo por zona) o 'parquet' (todas las series
+                 en un solo archivo en formato largo con columna 'zona')
     """
     print(f"\n📊 Guardando reportes...")
     
+    if formato not in ('csv', 'parquet'):
+        raise ValueError(f"Formato '{formato}' no reconocido")
+    
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     carpeta_reportes = RUTA_REPORTES_SEGMENTACION
     carpeta_reportes.mkdir(exist_ok=True, parents=True)
@@ -515,19 +579,29 @@ def guardar_reportes_segmentacion(indice, metodo, segmentacion, resultados_zonas
     
     # 1. Comparación entre zonas
     archivo = carpeta_reportes / f"comparacion_zonas_{indice}_{metodo}_{timestamp}.csv"
-    df_comparacion.to_csv(archivo, index=False)
+    archivo = _guardar_tabla(df_comparacion, archivo, formato)
     archivos.append(archivo.name)
     
     # 2. Series temporales por zona
-    for zona_id, resultado in resultados_zonas.items():
-        archivo = carpeta_reportes / f"serie_zona{zona_id}_{indice}_{metodo}_{timestamp}.csv"
-        resultado['df'].to_csv(archivo, index=False)
+    if formato == 'parquet':
+        # Un solo archivo en formato largo en lugar de n_zonas archivos
+        df_series = pd.concat(
+            [resultado['df'].assign(zona=zona_id) for zona_id, resultado in resultados_zonas.items()],
+            ignore_index=True
+        )
+        archivo = carpeta_reportes / f"series_zonas_{indice}_{metodo}_{timestamp}.csv"
+        archivo = _guardar_tabla(df_series, archivo, formato)
         archivos.append(archivo.name)
+    else:
+        for zona_id, resultado in resultados_zonas.items():
+            archivo = carpeta_reportes / f"serie_zona{zona_id}_{indice}_{metodo}_{timestamp}.csv"
+            resultado['df'].to_csv(archivo, index=False)
+            archivos.append(archivo.name)
     
     # 3. Estadísticas de segmentación
     df_stats = pd.DataFrame(segmentacion['stats_zonas'])
     archivo = carpeta_reportes / f"estadisticas_segmentacion_{indice}_{metodo}_{timestamp}.csv"
-    df_stats.to_csv(archivo, index=False)
+    archivo = _guardar_tabla(df_stats, archivo, formato)
     archivos.append(archivo.name)
     
     print(f"✓ Guardados {len(archivos)} reportes")
@@ -541,88 +615,179 @@ def guardar_reportes_segmentacion(indice, metodo, segmentacion, resultados_zonas
 # VISUALIZACIONES
 # ============================================================================
 
-def generar_visualizaciones_segmentacion(indice, metodo, segmentacion, resultados_zonas):
+# Máximo de puntos por serie al graficar (arriba de esto se usa LTTB)
+MAX_PUNTOS_SERIE = 2000
+
+
+def _indices_lttb(x, y, n_salida):
     """
-    Genera visualizaciones de segmentación.
+    Índices de los puntos a conservar según Largest-Triangle-Three-Buckets.
+    
+    Reduce una serie a n_salida puntos conservando su forma visual: en cada
+    bloque se elige el punto que forma el triángulo más grande con el punto
+    elegido antes y con el promedio del bloque siguiente.
+    
+    Args:
+        x, y: Arrays 1D numéricos (sin NaN), x ordenado
+        n_salida: Número de puntos a conservar
+        
+    Returns:
+        Array de índices (incluye el primero y el último)
     """
-    print(f"\nGenerando visualizaciones...")
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # Límites de los n_salida-2 bloques interiores (más uno extra para el promedio)
+    bordes = (np.arange(n_salida - 1) * (n - 2) / (n_salida - 2)).astype(np.intp) + 1
+    bordes = np.append(bordes, n)
+    
+    indices = np.empty(n_salida, dtype=np.intp)
+    indices[0] = 0
+    a = 0
+    for i in range(n_salida - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        sig_inicio, sig_fin = bordes[i + 1], bordes[i + 2]
+        
+        x_prom = x[sig_inicio:sig_fin].mean()
+        y_prom = y[sig_inicio:sig_fin].mean()
+        
+        areas = np.abs((x[a] - x_prom) * (y[inicio:fin] - y[a])
+                       - (x[a] - x[inicio:fin]) * (y_prom - y[a]))
+        a = inicio + int(np.argmax(areas))
+        indices[i + 1] = a
+    
+    indices[-1] = n - 1
+    return indices
+
+
+def _figura_a_png(fig, dpi):
+    """
+    Renderiza una figura a bytes PNG y la cierra.
     
+    Usa compresión zlib nivel 1 (sigue siendo sin pérdida): el PNG pesa algo
+    más pero se codifica mucho más rápido que con el nivel 6 por defecto.
+    """
     import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
     
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    carpeta_vis = RUTA_VISUALIZACIONES / indice / "segmentacion"
-    carpeta_vis.mkdir(exist_ok=True, parents=True)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, pil_kwargs={'compress_level': 1})
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _colorear_zonas(mascara_zonas, valid_mask, cmap, norm):
+    """
+    Convierte el mapa de zonas a una imagen RGBA uint8 (H, W, 4).
     
-    visualizaciones = []
+    Los colores salen de una tabla con una fila por zona (más una fila
+    transparente para los píxeles sin datos), así que imshow no tiene que
+    normalizar ni aplicar el colormap píxel por píxel.
+    """
+    import matplotlib
+    
+    n_ids = int(norm.vmax) + 1
+    tabla = np.zeros((n_ids + 1, 4), dtype=np.uint8)
+    tabla[:n_ids] = matplotlib.colormaps[cmap](norm(np.arange(n_ids)), bytes=True)
+    
+    indices = np.where(valid_mask, mascara_zonas, n_ids)
+    return np.take(tabla, indices, axis=0)
+
+
+def _fig_mapa_zonas(archivo, indice, metodo, rgba_zonas, norm_zonas):
+    """1. Mapa de zonas. Retorna (archivo, bytes PNG)."""
+    import matplotlib.pyplot as plt
+    from matplotlib.cm import ScalarMappable
     
-    # 1. Mapa de zonas
-    archivo = carpeta_vis / f"mapa_zonas_{indice}_{metodo}_{timestamp}.png"
     fig, ax = plt.subplots(figsize=(10, 8))
     
-    im = ax.imshow(segmentacion['mascara_zonas'], cmap='tab10', interpolation='nearest')
-    plt.colorbar(im, ax=ax, label='Zona ID')
+    ax.imshow(rgba_zonas, interpolation='nearest')
+    plt.colorbar(ScalarMappable(norm=norm_zonas, cmap='tab10'), ax=ax, label='Zona ID')
     ax.set_title(f'{indice} - Segmentación de Zonas\nMétodo: {metodo}')
     ax.axis('off')
     
-    plt.tight_layout()
-    plt.savefig(archivo, dpi=150, bbox_inches='tight')
-    plt.close()
-    visualizaciones.append(archivo.name)
+    fig.tight_layout()
+    return archivo, _figura_a_png(fig, dpi=100)
+
+
+def _fig_mapa_estadisticas(archivo, indice, metodo, rgba_zonas, norm_zonas, imagen_promedio,
+                           n_zonas, mascara_zonas, valid_mask):
+    """
+    2. Mapa de zonas junto a la imagen promedio. Retorna (archivo, bytes PNG).
+    
+    Los paneles que muestran el mapa de zonas usan la misma normalización
+    (norm_zonas), sin recalcular la escala de colores.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.cm import ScalarMappable
     
-    # 2. Mapa con estadísticas
-    archivo = carpeta_vis / f"mapa_estadisticas_{indice}_{metodo}_{timestamp}.png"
     fig, axes = plt.subplots(1, 2, figsize=(16, 6))
     
     # Zonas
     ax = axes[0]
-    im = ax.imshow(segmentacion['mascara_zonas'], cmap='tab10', interpolation='nearest')
+    ax.imshow(rgba_zonas, interpolation='nearest')
     ax.set_title('Zonas Identificadas')
     ax.axis('off')
     
     # Imagen promedio o referencia
     ax = axes[1]
-    if 'imagen_promedio' in segmentacion:
-        im = ax.imshow(segmentacion['imagen_promedio'], cmap='RdYlGn', interpolation='nearest')
+    if imagen_promedio is not None:
+        im = ax.imshow(imagen_promedio, cmap='RdYlGn', interpolation='nearest')
     else:
-        # Usar primera imagen
-        im = ax.imshow(segmentacion['mascara_zonas'], cmap='RdYlGn', interpolation='nearest')
+        # Sin imagen promedio: reutilizar el mapa de zonas y su normalización
+        ax.imshow(_colorear_zonas(mascara_zonas, valid_mask, 'RdYlGn', norm_zonas),
+                  interpolation='nearest')
+        im = ScalarMappable(norm=norm_zonas, cmap='RdYlGn')
     plt.colorbar(im, ax=ax, label=indice)
     ax.set_title('Valores Promedio')
     ax.axis('off')
     
-    plt.suptitle(f'{indice} - Segmentación: {metodo} ({segmentacion["n_zonas"]} zonas)', 
+    fig.suptitle(f'{indice} - Segmentación: {metodo} ({n_zonas} zonas)', 
                  fontsize=14, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig(archivo, dpi=150, bbox_inches='tight')
-    plt.close()
-    visualizaciones.append(archivo.name)
-    
-    # 3. Series temporales por zona
-    archivo = carpeta_vis / f"series_temporales_{indice}_{metodo}_{timestamp}.png"
+    fig.tight_layout()
+    return archivo, _figura_a_png(fig, dpi=100)
+
+
+def _fig_series_zonas(archivo, indice, n_zonas, resultados_zonas):
+    """3. Series temporales por zona. Retorna (archivo, bytes PNG)."""
+    import matplotlib.pyplot as plt
     
-    n_zonas = segmentacion['n_zonas']
     n_cols = min(3, n_zonas)
     n_rows = int(np.ceil(n_zonas / n_cols))
     
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(16, 4*n_rows))
+    alto = 4 * n_rows
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(16, alto), constrained_layout=False)
     if n_zonas == 1:
         axes = np.array([axes])
     axes = axes.flatten()
     
+    # Todas las zonas comparten las mismas fechas (misma serie de imágenes):
+    # los días desde la primera fecha se calculan una sola vez
+    fechas = resultados_zonas[0]['df']['fecha']
+    dias = (fechas - fechas.min()).dt.days.to_numpy()
+    
     for zona_id in range(n_zonas):
         ax = axes[zona_id]
         df_zona = resultados_zonas[zona_id]['df']
         
-        ax.plot(df_zona['fecha'], df_zona['media'], 'o-', linewidth=2, markersize=6)
+        # Series muy largas: reducir puntos antes de graficar (misma forma visual)
+        df_grafica = df_zona
+        if len(df_zona) > MAX_PUNTOS_SERIE:
+            df_grafica = df_zona.dropna(subset=['fecha', 'media'])
+            idx = _indices_lttb(df_grafica['fecha'].astype('int64').values,
+                                df_grafica['media'].values, MAX_PUNTOS_SERIE)
+            df_grafica = df_grafica.iloc[idx]
+        
+        ax.plot(df_grafica['fecha'], df_grafica['media'], 'o-', linewidth=2, markersize=6)
         
         # Línea de tendencia si existe
         if resultados_zonas[zona_id]['tendencia']:
             tend = resultados_zonas[zona_id]['tendencia']
-            fecha_inicial = df_zona['fecha'].min()
-            dias = (df_zona['fecha'] - fecha_inicial).dt.days
             y_pred = tend['intercepto'] + tend['pendiente'] * dias
-            ax.plot(df_zona['fecha'], y_pred, 'r--', linewidth=2, alpha=0.7,
+            ax.plot(fechas, y_pred, 'r--', linewidth=2, alpha=0.7,
                    label=f"Tendencia (R²={tend['r2']:.3f})")
             ax.legend()
         
@@ -636,14 +801,18 @@ def generar_visualizaciones_segmentacion(indice, metodo, segmentacion, resultado
     for i in range(n_zonas, len(axes)):
         axes[i].axis('off')
     
-    plt.suptitle(f'{indice} - Evolución Temporal por Zona', fontsize=14, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig(archivo, dpi=150, bbox_inches='tight')
-    plt.close()
-    visualizaciones.append(archivo.name)
+    fig.suptitle(f'{indice} - Evolución Temporal por Zona', fontsize=14, fontweight='bold')
+    # Márgenes fijos (en pulgadas) en lugar de tight_layout, que resuelve el
+    # layout de toda la cuadrícula; abajo queda espacio para las fechas rotadas
+    fig.subplots_adjust(left=0.05, right=0.98, top=1 - 0.8 / alto, bottom=1.1 / alto,
+                        wspace=0.25, hspace=1.3 / (alto / n_rows - 1.3))
+    return archivo, _figura_a_png(fig, dpi=150)
+
+
+def _fig_comparacion_tendencias(archivo, indice, n_zonas, resultados_zonas):
+    """4. Comparación de tendencias. Retorna (archivo, bytes PNG)."""
+    import matplotlib.pyplot as plt
     
-    # 4. Comparación de tendencias
-    archivo = carpeta_vis / f"comparacion_tendencias_{indice}_{metodo}_{timestamp}.png"
     fig, ax = plt.subplots(figsize=(12, 6))
     
     tendencias_data = []
@@ -671,10 +840,85 @@ def generar_visualizaciones_segmentacion(indice, metodo, segmentacion, resultado
         for i, (zona, pend, r2) in enumerate(zip(df_tend['zona'], df_tend['pendiente'], df_tend['r2'])):
             ax.text(i, pend, f'R²={r2:.2f}', ha='center', va='bottom' if pend > 0 else 'top', fontsize=9)
     
-    plt.tight_layout()
-    plt.savefig(archivo, dpi=150, bbox_inches='tight')
-    plt.close()
-    visualizaciones.append(archivo.name)
+    fig.tight_layout()
+    return archivo, _figura_a_png(fig, dpi=150)
+
+
+def generar_visualizaciones_segmentacion(indice, metodo, segmentacion, resultados_zonas):
+    """
+    Genera visualizaciones de segmentación.
+    
+    Las cuatro figuras son independientes, así que se renderizan en procesos
+    separados (backend Agg) y el proceso principal solo escribe los PNG.
+    Si el pool de procesos no se puede crear o se rompe, se generan en serie.
+    """
+    print(f"\nGenerando visualizaciones...")
+    
+    import pickle
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    carpeta_vis = RUTA_VISUALIZACIONES / indice / "segmentacion"
+    carpeta_vis.mkdir(exist_ok=True, parents=True)
+    
+    # NOTA: Los mapas se exportan a 100 dpi (imágenes grandes) y las gráficas a 150.
+    # No se usa bbox_inches='tight' porque obliga a renderizar la figura dos veces;
+    # tight_layout() ya ajusta los márgenes.
+    
+    mascara_zonas = segmentacion['mascara_zonas']
+    valid_mask = segmentacion['valid_mask']
+    n_zonas = segmentacion['n_zonas']
+    
+    # Una sola normalización para todos los paneles del mapa de zonas
+    # (mismos límites que calcularía imshow, pero calculados una vez)
+    from matplotlib.colors import Normalize
+    zonas_validas = mascara_zonas[valid_mask]
+    norm_zonas = Normalize(vmin=float(zonas_validas.min()), vmax=float(zonas_validas.max()))
+    
+    # Mapa de zonas ya coloreado (RGBA uint8); píxeles sin datos transparentes
+    rgba_zonas = _colorear_zonas(mascara_zonas, valid_mask, 'tab10', norm_zonas)
+    
+    # Solo se envían a los procesos los datos que usa cada figura
+    resultados_graficas = {
+        zona_id: {'df': resultados_zonas[zona_id]['df'],
+                  'tendencia': resultados_zonas[zona_id]['tendencia']}
+        for zona_id in range(n_zonas)
+    }
+    
+    tareas = [
+        (_fig_mapa_zonas,
+         (carpeta_vis / f"mapa_zonas_{indice}_{metodo}_{timestamp}.png",
+          indice, metodo, rgba_zonas, norm_zonas)),
+        (_fig_mapa_estadisticas,
+         (carpeta_vis / f"mapa_estadisticas_{indice}_{metodo}_{timestamp}.png",
+          indice, metodo, rgba_zonas, norm_zonas, segmentacion.get('imagen_promedio'), n_zonas,
+          mascara_zonas, valid_mask)),
+        (_fig_series_zonas,
+         (carpeta_vis / f"series_temporales_{indice}_{metodo}_{timestamp}.png",
+          indice, n_zonas, resultados_graficas)),
+    ]
+    
+    # La comparación de tendencias solo tiene sentido si alguna zona tiene tendencia
+    if any(resultados_graficas[zona_id]['tendencia'] for zona_id in range(n_zonas)):
+        tareas.append(
+            (_fig_comparacion_tendencias,
+             (carpeta_vis / f"comparacion_tendencias_{indice}_{metodo}_{timestamp}.png",
+              indice, n_zonas, resultados_graficas)))
+    
+    try:
+        with ProcessPoolExecutor(max_workers=len(tareas)) as executor:
+            futuros = [executor.submit(funcion, *args) for funcion, args in tareas]
+            figuras = [futuro.result() for futuro in futuros]
+    except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+        # Solo fallos del pool o del envío de datos; un error al dibujar se propaga
+        print(f"⚠️  No se pudieron generar en paralelo ({e}); generando en serie...")
+        figuras = [funcion(*args) for funcion, args in tareas]
+    
+    visualizaciones = []
+    for archivo, png in figuras:
+        archivo.write_bytes(png)
+        visualizaciones.append(archivo.name)
     
     print(f"✓ Generadas {len(visualizaciones)} visualizaciones")
     for nombre in visualizaciones:
@@ -702,20 +946,25 @@ def menu_principal():
         print("\nERROR: No se encontraron índices con datos.")
         return
     
+    # Textos del menú (se arman una sola vez, no en cada vuelta del ciclo)
+    texto_menu = "\n".join(
+        ["\n" + "="*80, "ÍNDICES DISPONIBLES:", "="*80]
+        + [f"  {i}. {indice:<8} - {INDICES_INFO[indice]['nombre']}"
+           for i, indice in enumerate(indices_disponibles, 1)]
+        + ["\nMÉTODOS DE SEGMENTACIÓN:",
+           "  C. Clustering (K-means con coordenadas)",
+           "  Q. Cuadrantes (división regular del espacio)",
+           "  P. Percentiles (por rangos de valores)",
+           "  A. Analizar TODOS los índices con clustering",
+           "  0. Salir"]
+    )
+    texto_seleccion = "\n".join(
+        ["\nSelecciona el índice:"]
+        + [f"  {i}. {indice}" for i, indice in enumerate(indices_disponibles, 1)]
+    )
+    
     while True:
-        print("\n" + "="*80)
-        print("ÍNDICES DISPONIBLES:")
-        print("="*80)
-        
-        for i, indice in enumerate(indices_disponibles, 1):
-            print(f"  {i}. {indice:<8} - {INDICES_INFO[indice]['nombre']}")
-        
-        print("\nMÉTODOS DE SEGMENTACIÓN:")
-        print("  C. Clustering (K-means con coordenadas)")
-        print("  Q. Cuadrantes (división regular del espacio)")
-        print("  P. Percentiles (por rangos de valores)")
-        print("  A. Analizar TODOS los índices con clustering")
-        print("  0. Salir")
+        print(texto_menu)
         
         opcion = input("\nSelecciona una opción: ").strip().upper()
         
@@ -729,9 +978,7 @@ def menu_principal():
         
         elif opcion in ['C', 'Q', 'P']:
             # Seleccionar índice
-            print("\nSelecciona el índice:")
-            for i, indice in enumerate(indices_disponibles, 1):
-                print(f"  {i}. {indice}")
+            print(texto_seleccion)
             
             idx_str = input("Número: ").strip()
             if not idx_str.isdigit():
@@ -770,9 +1017,46 @@ def menu_principal():
                 analizar_segmentacion_indice(indices_disponibles[num], metodo='clustering', n_zonas=5)
 
 
+def parsear_argumentos(argv=None):
+    """
+    Argumentos de línea de comandos para correr la segmentación sin menú.
+    
+    Ejemplo:
+        python 04_segmentacion_zonas.py --indice NDVI --metodo percentiles --n-zonas 5
+        python 04_segmentacion_zonas.py --all
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Segmentación de zonas y análisis por región")
+    parser.add_argument('--indice', action='append', choices=sorted(INDICES_INFO),
+                        help="Índice a segmentar (se puede repetir)")
+    parser.add_argument('--all', action='store_true',
+                        help="Segmentar todos los índices disponibles")
+    parser.add_argument('--metodo', default='clustering',
+                        choices=['clustering', 'cuadrantes', 'percentiles'])
+    parser.add_argument('--n-zonas', type=int, default=None,
+                        help="Número de zonas (default: 5, o 9 para cuadrantes)")
+    parser.add_argument('--formato', default='csv', choices=['csv', 'parquet'],
+                        help="Formato de los reportes")
+    
+    args = parser.parse_args(argv)
+    if not args.all and not args.indice:
+        parser.error("indica --indice o --all")
+    if args.n_zonas is None:
+        args.n_zonas = 9 if args.metodo == 'cuadrantes' else 5
+    return args
+
+
 if __name__ == "__main__":
     import os
-    if os.environ.get('ANALISIS_AUTOMATICO') == '1':
+    if len(sys.argv) > 1:
+        # Modo por línea de comandos: sin menú interactivo
+        args = parsear_argumentos()
+        indices = obtener_indices_disponibles() if args.all else args.indice
+        for indice in indices:
+            analizar_segmentacion_indice(indice, metodo=args.metodo, n_zonas=args.n_zonas,
+                                         formato=args.formato)
+    elif os.environ.get('ANALISIS_AUTOMATICO') == '1':
         # Modo automático: analizar todos los índices con clustering
         print("\nModo automático: segmentando TODOS los índices con clustering\n")
         indices_disponibles = obtener_indices_disponibles()
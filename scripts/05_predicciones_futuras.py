@@ -16,10 +16,14 @@ El sistema "aprende" cómo ha cambiado la vegetación y estima
 cómo seguirá cambiando en el futuro cercano.
 """
 
+import os
 import sys
+import hashlib
 from pathlib import Path
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Solo se exportan PNG, no se necesita interfaz gráfica
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from datetime import datetime, timedelta
@@ -118,7 +122,7 @@ class RedNeuronalSimple:
         """
         Predice los próximos n días.
         
-        Retorna: lista con valores predichos
+        Retorna: array con valores predichos
         
         En términos simples: Continúa la tendencia que aprendió
         hacia el futuro.
@@ -126,118 +130,333 @@ class RedNeuronalSimple:
         if not self.aprendido:
             return None
         
-        # Generar predicciones
-        predicciones = []
-        valor_actual = self.pesos['ultimo_valor']
-        
-        for i in range(n_dias):
-            # Próximo valor = valor actual + tendencia
-            proximo_valor = valor_actual + self.pesos['pendiente']
-            
-            # Limitar a rangos razonables
-            proximo_valor = np.clip(proximo_valor, -1, 1)
-            
-            predicciones.append(proximo_valor)
-            valor_actual = proximo_valor
+        # Próximo valor = valor actual + tendencia, limitado a rangos razonables.
+        # Después del primer día la serie ya está en [-1, 1] y solo avanza en una
+        # dirección, así que recortar al final equivale a recortar día por día.
+        pendiente = self.pesos['pendiente']
+        primer_valor = np.clip(self.pesos['ultimo_valor'] + pendiente, -1, 1)
+        return np.clip(primer_valor + pendiente * np.arange(n_dias), -1, 1)
+    
+    def predecir_media(self, n_dias=30):
+        """
+        Promedio de los próximos n días (igual a np.mean(self.predecir(n_dias)))
+        sin generar la serie completa.
+        """
+        if not self.aprendido:
+            return None
         
-        return predicciones
+        return float(_media_prediccion(self.pesos['ultimo_valor'], self.pesos['pendiente'], n_dias))
 
 
 # ============================================================================
 # FUNCIONES DE PREDICCIÓN
 # ============================================================================
 
-def preparar_datos_por_pixel(imagenes_info):
+def _ruta_cache_datos(indice, imagenes_info, prefijo='cache'):
+    """
+    Ruta de un caché .npy de un índice ('cache': array 3D, 'pesos': modelo).
+    
+    La clave depende de las fechas, nombres, fecha de modificación y tamaño
+    de cada archivo, así que si cambia el conjunto de imágenes o se
+    reprocesa un TIFF con el mismo nombre se genera un caché nuevo.
+    """
+    claves = []
+    for img in imagenes_info:
+        info = Path(img['ruta']).stat()
+        claves.append(f"{img['fecha_str']}|{Path(img['ruta']).name}|"
+                      f"{info.st_mtime_ns}|{info.st_size}")
+    claves.sort()
+    clave = hashlib.md5("\n".join(claves).encode('utf-8')).hexdigest()[:12]
+    return RUTA_REPORTES_PREDICCIONES / "cache" / f"{prefijo}_{indice}_{clave}.npy"
+
+
+def _limpiar_caches_anteriores(ruta_actual):
+    """
+    Borra los cachés del mismo tipo e índice que no sean ruta_actual.
+    
+    Cada cambio en las imágenes genera una clave nueva; sin esto quedaría
+    en disco un array completo por cada versión anterior.
+    """
+    prefijo = ruta_actual.name.rsplit('_', 1)[0]
+    for ruta in ruta_actual.parent.glob(f"{prefijo}_*.npy"):
+        if ruta != ruta_actual:
+            try:
+                ruta.unlink()
+            except OSError as e:
+                print(f"ADVERTENCIA: No se pudo borrar el caché {ruta.name}: {e}")
+
+
+# Orden de los planos en el archivo de pesos (H, W, 4)
+PLANOS_PESOS = ('pendiente', 'media', 'std', 'ultimo_valor')
+
+
+def _guardar_pesos(ruta_pesos, pesos):
+    """
+    Guarda los pesos entrenados como un solo array float32 (H, W, 4).
+    
+    ruta_pesos viene de _ruta_cache_datos(..., prefijo='pesos'), cuya clave
+    incluye fecha de modificación y tamaño de cada TIFF; los pesos de
+    versiones anteriores de las imágenes se borran.
+    """
+    try:
+        ruta_pesos.parent.mkdir(exist_ok=True, parents=True)
+        np.save(ruta_pesos, np.stack([pesos[plano] for plano in PLANOS_PESOS], axis=-1)
+                .astype(np.float32, copy=False))
+    except OSError as e:
+        print(f"ADVERTENCIA: No se pudieron guardar los pesos: {e}")
+    else:
+        _limpiar_caches_anteriores(ruta_pesos)
+
+
+def _cargar_pesos(ruta_pesos, forma):
+    """
+    Carga pesos guardados con _guardar_pesos.
+    
+    Retorna el mismo dict que entrenar_por_pixel, o None si no hay caché
+    válido para una imagen de la forma indicada. Como la ruta depende del
+    contenido de los TIFF (ver _ruta_cache_datos), un TIFF reescrito con
+    el mismo nombre no reutiliza pesos viejos.
+    """
+    if ruta_pesos is None or not ruta_pesos.exists():
+        return None
+    try:
+        planos = np.load(ruta_pesos)
+    except (OSError, ValueError) as e:
+        print(f"ADVERTENCIA: Pesos en caché inválidos, se reentrena: {e}")
+        return None
+    if planos.shape != (*forma, len(PLANOS_PESOS)):
+        return None
+    
+    pesos = {plano: planos[..., k] for k, plano in enumerate(PLANOS_PESOS)}
+    # Los píxeles con modelo son los que tienen pendiente (NaN en el resto)
+    pesos['aprendido'] = ~np.isnan(pesos['pendiente'])
+    return pesos
+
+
+def preparar_datos_por_pixel(imagenes_info, indice=None):
     """
     Organiza los datos para que cada píxel tenga su historia temporal.
     
+    Si se indica el índice, el array 3D se guarda en un caché .npy y en
+    ejecuciones siguientes se abre con mmap (sin volver a leer los TIFF).
+    
     Retorna:
-    - array 3D: [filas, columnas, tiempo]
+    - array 3D float32: [tiempo, filas, columnas] (cada fecha es contigua en memoria)
     - fechas: lista de fechas
     """
+    fechas = [img_info['fecha'] for img_info in imagenes_info]
+    
+    ruta_cache = _ruta_cache_datos(indice, imagenes_info) if indice else None
+    if ruta_cache is not None and ruta_cache.exists():
+        try:
+            datos_3d = np.load(ruta_cache, mmap_mode='r')
+            print(f"\n✓ {datos_3d.shape[0]} imágenes cargadas desde caché ({ruta_cache.name})")
+            return datos_3d, fechas
+        except (OSError, ValueError) as e:
+            print(f"\nADVERTENCIA: Caché inválido, se recargan las imágenes: {e}")
+    
     print("\nCargando imágenes...")
     
-    # Cargar todas las imágenes
+    from concurrent.futures import ThreadPoolExecutor
+    
+    # Cargar todas las imágenes. La lectura/decodificación de los TIFF libera
+    # el GIL, así que varios hilos solapan disco y CPU; map conserva el orden.
+    # NOTA: Predicciones necesitan estructura espacial 2D, usar TIFF
     imagenes_datos = []
-    fechas = []
     
-    for i, img_info in enumerate(imagenes_info, 1):
-        print(f"  [{i}/{len(imagenes_info)}] {img_info['fecha_str']}", end='\r')
-        
-        # NOTA: Predicciones necesitan estructura espacial 2D, usar TIFF
-        datos = cargar_imagen_enmascarada(img_info['ruta'])
-        imagenes_datos.append(datos)
-        fechas.append(img_info['fecha'])
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        cargas = executor.map(cargar_imagen_enmascarada, [img_info['ruta'] for img_info in imagenes_info])
+        for i, (img_info, datos) in enumerate(zip(imagenes_info, cargas), 1):
+            print(f"  [{i}/{len(imagenes_info)}] {img_info['fecha_str']}", end='\r')
+            imagenes_datos.append(datos)
     
     print(f"\n✓ {len(imagenes_datos)} imágenes cargadas")
     
-    # Convertir a array 3D
-    datos_3d = np.stack(imagenes_datos, axis=2)
+    # Convertir a array 3D (tiempo primero; float32 basta y usa la mitad de memoria)
+    datos_3d = np.stack(imagenes_datos, axis=0).astype(np.float32, copy=False)
+    
+    if ruta_cache is not None:
+        try:
+            ruta_cache.parent.mkdir(exist_ok=True, parents=True)
+            np.save(ruta_cache, datos_3d)
+        except OSError as e:
+            print(f"ADVERTENCIA: No se pudo guardar el caché: {e}")
+        else:
+            _limpiar_caches_anteriores(ruta_cache)
     
     return datos_3d, fechas
 
 
-def predecir_por_pixel(datos_3d, n_dias_futuro=30):
+def _media_prediccion(ultimo_valor, pendiente, n_dias):
+    """
+    Promedio exacto de las predicciones de RedNeuronalSimple.predecir, sin iterar.
+    
+    La predicción del día k es clip(v1 + (k-1)*pendiente, -1, 1) con
+    v1 = clip(ultimo_valor + pendiente, -1, 1). Una vez que la secuencia
+    toca un límite se queda ahí, así que la suma se puede separar en la
+    parte sin recortar (progresión aritmética) y la parte pegada al límite.
+    Funciona con escalares o arrays.
+    """
+    ultimo_valor = np.asarray(ultimo_valor, dtype=np.float64)
+    pendiente = np.asarray(pendiente, dtype=np.float64)
+    
+    v1 = np.clip(ultimo_valor + pendiente, -1, 1)
+    limite = np.where(pendiente > 0, 1.0, -1.0)
+    
+    # Número de días antes de tocar el límite
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m = np.floor((limite - v1) / pendiente) + 1
+    m = np.where(pendiente == 0, n_dias, np.clip(m, 0, n_dias))
+    
+    suma = m * v1 + pendiente * m * (m - 1) / 2 + (n_dias - m) * limite
+    return suma / n_dias
+
+
+def entrenar_por_pixel(datos_3d, ventana=5):
+    """
+    Entrena el equivalente de RedNeuronalSimple para todos los píxeles a la vez.
+    
+    En lugar de un np.polyfit por píxel, la pendiente sale de sumas sobre el
+    eje del tiempo ignorando NaN (pendiente = cov(t, y) / var(t)), en un solo
+    recorrido del array 3D.
+    
+    Parámetros:
+    - datos_3d: array [tiempo, filas, columnas]
+    - ventana: igual que en RedNeuronalSimple
+    
+    Retorna: dict con mapas 'pendiente', 'media', 'std', 'ultimo_valor'
+    y 'aprendido' (booleano: píxeles con al menos 2 datos válidos)
+    """
+    n_tiempos = datos_3d.shape[0]
+    validos = ~np.isnan(datos_3d)
+    n = validos.sum(axis=0)
+    
+    # Mismas condiciones que RedNeuronalSimple.entrenar
+    aprendido = (n >= 2) & (n_tiempos >= ventana + 1)
+    
+    t = np.arange(n_tiempos, dtype=datos_3d.dtype)[:, None, None]
+    y = np.where(validos, datos_3d, 0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_t = (validos * t).sum(axis=0) / n
+        media_y = y.sum(axis=0) / n
+        
+        dt = np.where(validos, t - media_t, 0)
+        dy = np.where(validos, datos_3d - media_y, 0)
+        
+        pendiente = (dt * dy).sum(axis=0) / (dt * dt).sum(axis=0)
+        std = np.sqrt((dy * dy).sum(axis=0) / n)
+    
+    # Último valor válido de cada píxel
+    idx_ultimo = n_tiempos - 1 - np.argmax(validos[::-1], axis=0)
+    ultimo_valor = np.take_along_axis(datos_3d, idx_ultimo[None], axis=0)[0]
+    
+    sin_modelo = ~aprendido
+    for mapa in (pendiente, media_y, std, ultimo_valor):
+        mapa[sin_modelo] = np.nan
+    
+    return {
+        'pendiente': pendiente,
+        'media': media_y,
+        'std': std,
+        'ultimo_valor': ultimo_valor,
+        'aprendido': aprendido
+    }
+
+
+def _entrenar_en_paralelo(datos_3d, ventana=5, filas_por_bloque=64):
+    """
+    Ejecuta entrenar_por_pixel por bloques de filas en varios hilos.
+    
+    NumPy libera el GIL en estas operaciones, así que los bloques se procesan
+    en paralelo en varios núcleos, y cada bloque mantiene pequeños los arrays
+    temporales.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    filas = datos_3d.shape[1]
+    if filas <= filas_por_bloque:
+        return entrenar_por_pixel(datos_3d, ventana=ventana)
+    
+    bloques = [datos_3d[:, i:i + filas_por_bloque] for i in range(0, filas, filas_por_bloque)]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        resultados = list(executor.map(lambda bloque: entrenar_por_pixel(bloque, ventana=ventana), bloques))
+    
+    return {clave: np.concatenate([r[clave] for r in resultados], axis=0) for clave in resultados[0]}
+
+
+def predecir_por_pixel(datos_3d, n_dias_futuro=30, ruta_pesos=None):
     """
     Predice el futuro para cada píxel usando su historia.
     
+    NOTA: Todos los píxeles se entrenan y predicen juntos con operaciones
+    vectorizadas (ver entrenar_por_pixel y _media_prediccion); el resultado
+    es el mismo que usar RedNeuronalSimple píxel por píxel.
+    
+    Si se indica ruta_pesos, los pesos entrenados se guardan ahí y en la
+    siguiente ejecución (por ejemplo con otro horizonte) se reutilizan sin
+    volver a entrenar.
+    
     Retorna:
     - mapa_prediccion: imagen con valor promedio predicho
     - mapa_cambio: imagen mostrando si mejorará o empeorará
     """
-    filas, cols, n_tiempos = datos_3d.shape
+    n_tiempos, filas, cols = datos_3d.shape
     ventana_modelo = min(5, max(1, n_tiempos - 1))
     
     print(f"\n🧠 Entrenando red neuronal para cada píxel...")
     print(f"   Total de píxeles a analizar: {filas * cols:,}")
     print(f"   Ventana temporal del modelo: {ventana_modelo} observaciones")
     
-    # Preparar mapas de salida
-    mapa_prediccion = np.full((filas, cols), np.nan)
-    mapa_cambio = np.full((filas, cols), np.nan)
-    mapa_confianza = np.full((filas, cols), np.nan)
+    # Máscara de píxeles con al menos un dato (se calcula una sola vez);
+    # los píxeles vacíos no se entrenan
+    con_datos = ~np.all(np.isnan(datos_3d), axis=0)
+    pixeles_procesados = int(np.sum(con_datos))
     
-    pixeles_procesados = 0
-    pixeles_con_prediccion = 0
-    
-    # Procesar cada píxel
-    for i in range(filas):
-        for j in range(cols):
-            # Serie temporal de este píxel
-            serie = datos_3d[i, j, :]
-            
-            # Saltar si no hay datos
-            if np.all(np.isnan(serie)):
-                continue
-            
-            pixeles_procesados += 1
-            
-            # Entrenar red para este píxel
-            red = RedNeuronalSimple(ventana=ventana_modelo)
-            
-            if red.entrenar(serie):
-                # Hacer predicción
-                prediccion = red.predecir(n_dias_futuro)
-                
-                if prediccion is not None:
-                    pixeles_con_prediccion += 1
-                    
-                    # Valor promedio predicho
-                    mapa_prediccion[i, j] = np.mean(prediccion)
-                    
-                    # Cambio: diferencia entre último valor real y predicción
-                    ultimo_real = serie[~np.isnan(serie)][-1]
-                    cambio = np.mean(prediccion) - ultimo_real
-                    mapa_cambio[i, j] = cambio
-                    
-                    # Confianza: basada en la variabilidad
-                    confianza = 1.0 / (1.0 + red.pesos['std'])
-                    mapa_confianza[i, j] = confianza
+    pesos = _cargar_pesos(ruta_pesos, (filas, cols))
+    if pesos is not None:
+        print(f"   ✓ Pesos cargados desde caché ({ruta_pesos.name}), sin reentrenar")
+    else:
+        idx_validos = np.flatnonzero(con_datos)
+        
+        # Entrenar solo los píxeles con datos, como columna [tiempo, n_validos, 1]
+        # (bloques del mismo número de píxeles que 64 filas completas)
+        datos_validos = datos_3d.reshape(n_tiempos, -1)[:, idx_validos][:, :, None]
+        pesos_validos = _entrenar_en_paralelo(datos_validos, ventana=ventana_modelo,
+                                              filas_por_bloque=64 * cols)
         
-        # Progreso
-        if (i + 1) % 10 == 0:
-            progreso = ((i + 1) / filas) * 100
-            print(f"   Progreso: {progreso:.1f}% - Predicciones exitosas: {pixeles_con_prediccion}", end='\r')
+        # Devolver los pesos a la forma de la imagen (NaN / False en píxeles vacíos).
+        # Los planos quedan en float32, igual que en el caché, para que una
+        # ejecución desde caché dé exactamente el mismo resultado.
+        pesos = {}
+        for clave, valores in pesos_validos.items():
+            es_mascara = valores.dtype == bool
+            mapa = np.full(filas * cols, False if es_mascara else np.nan,
+                           dtype=bool if es_mascara else np.float32)
+            mapa[idx_validos] = valores.ravel()
+            pesos[clave] = mapa.reshape(filas, cols)
+        
+        if ruta_pesos is not None:
+            _guardar_pesos(ruta_pesos, pesos)
+    
+    # Preparar mapas de salida en un solo bloque (NaN donde no hay modelo)
+    mapas = np.full((3, filas, cols), np.nan, dtype=np.float32)
+    mapa_prediccion, mapa_cambio, mapa_confianza = mapas
+    aprendido = pesos['aprendido']
+    
+    # Hacer predicciones
+    np.copyto(mapa_prediccion,
+              _media_prediccion(pesos['ultimo_valor'], pesos['pendiente'], n_dias_futuro),
+              where=aprendido, casting='same_kind')
+    
+    # Cambio: diferencia entre último valor real y predicción
+    np.subtract(mapa_prediccion, pesos['ultimo_valor'], out=mapa_cambio, where=aprendido,
+                casting='same_kind')
+    
+    # Confianza: basada en la variabilidad
+    np.divide(1.0, 1.0 + pesos['std'], out=mapa_confianza, where=aprendido, casting='same_kind')
+    
+    pixeles_con_prediccion = int(np.sum(pesos['aprendido']))
     
     print(f"\n✓ Análisis completo:")
     print(f"   • Píxeles procesados: {pixeles_procesados:,}")
@@ -267,6 +486,25 @@ def clasificar_cambio(valor_cambio):
         return 5, "Mejorará mucho"
 
 
+def clasificar_cambios(mapa_cambio):
+    """
+    Clasifica todo un mapa de cambios en categorías de una sola vez.
+    
+    Categorías: 0 sin datos, 1 empeorará mucho (< -0.05), 2 empeorará poco
+    ([-0.05, -0.02)), 3 estable ([-0.02, 0.02]), 4 mejorará poco ((0.02, 0.05]),
+    5 mejorará mucho (> 0.05).
+    
+    Retorna: array uint8 con la misma forma que mapa_cambio
+    """
+    # Los límites negativos son cerrados por la izquierda y los positivos por la
+    # derecha, por eso se combinan dos digitize
+    categorias = np.ones(mapa_cambio.shape, dtype=np.uint8)
+    categorias += np.digitize(mapa_cambio, [-0.05, -0.02]).astype(np.uint8)
+    categorias += np.digitize(mapa_cambio, [0.02, 0.05], right=True).astype(np.uint8)
+    categorias[np.isnan(mapa_cambio)] = 0  # Sin datos
+    return categorias
+
+
 def crear_mapa_visual_simple(mapa_cambio, indice, fechas, n_dias_futuro):
     """
     Crea un mapa de predicción con degradado profesional y fácil de entender.
@@ -455,19 +693,16 @@ Cambio promedio: {cambio_promedio:+.2f}%"""
     carpeta_pred.mkdir(parents=True, exist_ok=True)
     
     archivo = carpeta_pred / f"{indice}_prediccion_{n_dias_futuro}dias_{datetime.now().strftime('%Y%m%d')}.png"
-    plt.savefig(archivo, dpi=150, bbox_inches='tight', facecolor='white', edgecolor='none')
+    # 100 dpi y sin bbox_inches='tight' (evita un segundo renderizado del mapa grande);
+    # compresión PNG nivel 1: sin pérdida y mucho más rápida que el nivel 6 por defecto
+    plt.savefig(archivo, dpi=100, facecolor='white', edgecolor='none',
+                pil_kwargs={'compress_level': 1})
     plt.close()
     
     print(f"✓ Mapa de predicción guardado: {archivo}")
     
     # También crear clasificación por categorías para el informe
-    mapa_categorias = np.full_like(mapa_cambio, 0)
-    mapa_categorias[mapa_cambio < -0.05] = 1  # Empeorará mucho
-    mapa_categorias[(mapa_cambio >= -0.05) & (mapa_cambio < -0.02)] = 2  # Empeorará poco
-    mapa_categorias[(mapa_cambio >= -0.02) & (mapa_cambio <= 0.02)] = 3  # Estable
-    mapa_categorias[(mapa_cambio > 0.02) & (mapa_cambio <= 0.05)] = 4  # Mejorará poco
-    mapa_categorias[mapa_cambio > 0.05] = 5  # Mejorará mucho
-    mapa_categorias[np.isnan(mapa_cambio)] = 0  # Sin datos
+    mapa_categorias = clasificar_cambios(mapa_cambio)
     
     return archivo, mapa_categorias
 
@@ -477,17 +712,22 @@ def crear_informe_simple(indice, mapa_categorias, mapa_cambio, mapa_prediccion,
     Crea un informe en lenguaje muy simple y directo.
     """
     # Contar píxeles por categoría
-    total_pixeles = np.sum(~np.isnan(mapa_cambio))
+    # NOTA: mapa_prediccion y mapa_cambio tienen NaN en los mismos píxeles
+    # (ver predecir_por_pixel), así que una sola máscara sirve para ambos
+    validos = ~np.isnan(mapa_cambio)
+    total_pixeles = int(np.sum(validos))
     
     if total_pixeles == 0:
         return None
     
+    # Un solo recorrido para las 6 categorías (0 = sin datos)
+    conteos = np.bincount(mapa_categorias.ravel().astype(np.intp, copy=False), minlength=6)
     categorias_count = {
-        'empeorara_mucho': np.sum(mapa_categorias == 1),
-        'empeorara_poco': np.sum(mapa_categorias == 2),
-        'estable': np.sum(mapa_categorias == 3),
-        'mejorara_poco': np.sum(mapa_categorias == 4),
-        'mejorara_mucho': np.sum(mapa_categorias == 5),
+        'empeorara_mucho': int(conteos[1]),
+        'empeorara_poco': int(conteos[2]),
+        'estable': int(conteos[3]),
+        'mejorara_poco': int(conteos[4]),
+        'mejorara_mucho': int(conteos[5]),
     }
     
     # Calcular porcentajes
@@ -507,14 +747,17 @@ def crear_informe_simple(indice, mapa_categorias, mapa_cambio, mapa_prediccion,
         tendencia_general = "ESTABLE"
         emoji = "➡️"
     
-    # Calcular cambio promedio
-    cambio_promedio = np.nanmean(mapa_cambio)
+    # Promedios en una pasada por mapa, sin crear mapa_prediccion + mapa_cambio:
+    # promedio(pred + cambio) = promedio(pred) + promedio(cambio)
+    cambio_promedio = np.sum(mapa_cambio, where=validos, dtype=np.float64) / total_pixeles
     cambio_promedio_pct = cambio_promedio * 100
+    prediccion_promedio = np.sum(mapa_prediccion, where=validos, dtype=np.float64) / total_pixeles
     
-    # Crear informe
+    # Crear informe (las secciones se juntan al final con un solo join)
     fecha_prediccion = (fechas[-1] + timedelta(days=n_dias_futuro)).strftime('%d de %B de %Y')
     
-    informe = f"""
+    partes = []
+    partes.append(f"""
 {'='*80}
 PREDICCIÓN DE VEGETACIÓN - {INDICES_INFO[indice]['nombre']}
 {'='*80}
@@ -541,8 +784,8 @@ INDICADORES NUMÉRICOS:
   • Cambio promedio esperado: {cambio_promedio_pct:+.2f}%
   • Área total analizada: {total_pixeles:,} píxeles
   
-  • Valor actual promedio: {np.nanmean(mapa_prediccion):>.4f}
-  • Valor predicho promedio: {np.nanmean(mapa_prediccion + mapa_cambio):>.4f}
+  • Valor actual promedio: {prediccion_promedio:>.4f}
+  • Valor predicho promedio: {prediccion_promedio + cambio_promedio:>.4f}
 
 ¿QUÉ SIGNIFICA ESTO?
 {'-'*80}
@@ -550,11 +793,11 @@ INDICADORES NUMÉRICOS:
 El índice {indice} ({INDICES_INFO[indice]['nombre']}) mide:
 {INDICES_INFO[indice]['descripcion']}
 
-"""
+""")
     
     # Añadir interpretación específica
     if tendencia_general == "DETERIORO":
-        informe += f"""
+        partes.append(f"""
 ALERTA: La predicción indica un deterioro en la vegetación.
 
 Posibles causas a investigar:
@@ -564,10 +807,10 @@ Posibles causas a investigar:
   • Falta de nutrientes en el suelo
 
 Recomendación: Monitorear de cerca y considerar intervenciones.
-"""
+""")
     
     elif tendencia_general == "MEJORA":
-        informe += f"""
+        partes.append(f"""
 OK: La predicción indica una mejora en la vegetación.
 
 Factores favorables posibles:
@@ -577,10 +820,10 @@ Factores favorables posibles:
   • Respuesta a fertilización
 
 Recomendación: Mantener las prácticas actuales.
-"""
+""")
     
     else:
-        informe += f"""
+        partes.append(f"""
 ➡️  ESTABLE: La vegetación se mantendrá sin cambios significativos.
 
 Esto indica:
@@ -589,9 +832,9 @@ Esto indica:
   • Sistema en homeostasis
 
 Recomendación: Continuar monitoreo de rutina.
-"""
+""")
     
-    informe += f"""
+    partes.append(f"""
 
 {'='*80}
 NOTAS TÉCNICAS:
@@ -610,7 +853,9 @@ LIMITACIONES:
 {'='*80}
 Informe generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')}
 {'='*80}
-"""
+""")
+    
+    informe = ''.join(partes)
     
     # Guardar informe
     carpeta_reportes = RUTA_REPORTES_PREDICCIONES
@@ -659,10 +904,11 @@ def ejecutar_prediccion(indice, n_dias_futuro=30):
     print(f"  • Última: {imagenes_info[-1]['fecha_str']}")
     
     # 2. Preparar datos temporales
-    datos_3d, fechas = preparar_datos_por_pixel(imagenes_info)
+    datos_3d, fechas = preparar_datos_por_pixel(imagenes_info, indice)
     
     # 3. Hacer predicciones
-    mapa_prediccion, mapa_cambio, mapa_confianza = predecir_por_pixel(datos_3d, n_dias_futuro)
+    ruta_pesos = _ruta_cache_datos(indice, imagenes_info, prefijo='pesos')
+    mapa_prediccion, mapa_cambio, mapa_confianza = predecir_por_pixel(datos_3d, n_dias_futuro, ruta_pesos)
     
     # 4. Crear visualización
     print("\n🎨 Generando mapa visual...")
@@ -711,7 +957,6 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Detectar modo automático
-    import os
     modo_automatico = os.environ.get('ANALISIS_AUTOMATICO') == '1'
     
     if modo_automatico:
@@ -10,16 +10,38 @@ Crea reportes en PDF con:
 Formato profesional listo para incluir en tesis.
 """
 
+import os
+import re
 import sys
+import csv
+import json
+import shutil
+import hashlib
+from fnmatch import fnmatch
+from functools import partial
 from pathlib import Path
+import matplotlib
+matplotlib.use('Agg')  # Sin interfaz gráfica (también en los procesos hijos)
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.transforms import Bbox, BboxTransformTo, TransformedBbox
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
+# PDF comprimido al máximo y con fuentes TrueType embebidas (texto vectorial);
+# trazos simplificados para que las páginas vectoriales pesen menos
+plt.rcParams.update({
+    'pdf.compression': 9,
+    'pdf.fonttype': 42,
+    'agg.path.chunksize': 10000,
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+})
+
 # Agregar rutas
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -32,107 +54,258 @@ from configuracion.config import (
     obtener_indices_disponibles
 )
 
+# Carpetas de reportes con CSV que usa el PDF
+CARPETAS_CSV = ['01_exploratorio', '02_espacial', '03_temporal', '05_predicciones']
 
-def crear_portada(pdf, indice):
-    """Crea portada del reporte."""
-    fig = plt.figure(figsize=(8.5, 11))
+# CSV ya leídos en este proceso: (ruta, mtime, tamaño, columnas, filas) -> DataFrame
+_cache_csv = {}
+
+
+def _leer_csv(ruta, usecols=None, nrows=None, dtype=None):
+    """
+    Lee un CSV una sola vez por proceso (las secciones comparten archivos).
+    
+    usecols, nrows y dtype se pasan a pd.read_csv, así que las columnas y
+    filas que no se van a mostrar ni siquiera se parsean, y las columnas con
+    tipo conocido se saltan la inferencia de tipos. La clave incluye fecha de
+    modificación y tamaño, así que si el análisis reescribe el archivo se
+    vuelve a leer. El DataFrame es compartido: no modificarlo en el lugar.
+    """
+    info = ruta.stat()
+    clave = (ruta.resolve(), info.st_mtime_ns, info.st_size,
+             tuple(usecols) if usecols is not None else None, nrows,
+             tuple(sorted(dtype.items())) if dtype is not None else None)
+    if clave not in _cache_csv:
+        df = pd.read_csv(ruta, usecols=usecols, nrows=nrows, dtype=dtype)
+        _cache_csv[clave] = df[list(usecols)] if usecols is not None else df
+    return _cache_csv[clave]
+
+
+def _contar_filas_csv(ruta):
+    """Número de filas de datos de un CSV, sin parsearlo."""
+    with open(ruta, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def _leer_primera_fila_csv(ruta):
+    """
+    Primera fila de un CSV como dict (columna -> texto) y número de filas.
+    
+    Para los CSV de resumen, que solo tienen una fila útil, es mucho más
+    barato que armar un DataFrame. Devuelve ({}, 0) si no hay filas. Las
+    líneas en blanco no se cuentan (DictReader las salta, igual que pandas).
+    """
+    with open(ruta, newline='', encoding='utf-8') as f:
+        lector = csv.DictReader(f)
+        fila = next(lector, None)
+        if fila is None:
+            return {}, 0
+        return fila, 1 + sum(1 for _ in lector)
+
+
+def _a_float(valor):
+    """Convierte un valor leído con csv a float (vacío -> NaN, como pandas)."""
+    return float(valor) if valor not in (None, '') else np.nan
+
+
+def _escanear_csvs():
+    """
+    Indexa los CSV de las carpetas de reportes por (carpeta, índice).
+    
+    Un solo os.scandir por carpeta; cada archivo queda en la lista de todos
+    los índices cuyo nombre contiene (igual que el patrón '*{indice}*.csv').
+    Las listas quedan ordenadas por nombre.
+    """
+    csvs_escaneados = {}
+    for carpeta in CARPETAS_CSV:
+        try:
+            with os.scandir(RUTA_REPORTES / carpeta) as entradas:
+                nombres = sorted(e.name for e in entradas if e.name.endswith('.csv') and e.is_file())
+        except FileNotFoundError:
+            continue
+        
+        for nombre in nombres:
+            for indice in INDICES_INFO:
+                if indice in nombre:
+                    csvs_escaneados.setdefault((carpeta, indice), []).append(RUTA_REPORTES / carpeta / nombre)
+    return csvs_escaneados
+
+
+def _buscar_csvs(csvs_escaneados, carpeta, indice, patron='*'):
+    """CSV de un índice en una carpeta (del índice ya escaneado), filtrados con un patrón glob."""
+    return [ruta for ruta in csvs_escaneados.get((carpeta, indice), []) if fnmatch(ruta.name, patron)]
+
+
+def _escanear_pngs(indice):
+    """
+    Lista los PNG de las visualizaciones de un índice en un solo recorrido.
+    
+    Retorna dict: subcarpeta relativa ('temporal', 'prediccion', ...)
+    -> lista de rutas ordenadas por nombre.
+    """
+    carpeta_vis = RUTA_VISUALIZACIONES / indice
+    pngs_por_carpeta = {}
+    for raiz, _, archivos in os.walk(carpeta_vis):
+        pngs = sorted(nombre for nombre in archivos if nombre.endswith('.png'))
+        if pngs:
+            relativa = Path(raiz).relative_to(carpeta_vis).as_posix()
+            pngs_por_carpeta[relativa] = [Path(raiz) / nombre for nombre in pngs]
+    return pngs_por_carpeta
+
+
+def _nueva_pagina(fig=None, solo_texto=False):
+    """
+    Prepara una página tamaño carta.
+    
+    Si se pasa la figura compartida del reporte, se limpia y se reutiliza
+    (evita crear y destruir una figura por página). Retorna (fig, ax, propia):
+    propia indica que la figura se creó aquí y hay que cerrarla al terminar.
+    
+    Con solo_texto=True no se crea ningún Axes (ejes, ticks y límites no se
+    usan en las páginas de texto): en lugar de ax se retorna una función
+    texto(x, y, s, ...) que escribe sobre la figura con las mismas
+    coordenadas 0-1 del área que ocuparía el subplot.
+    """
+    propia = fig is None
+    if propia:
+        fig = plt.figure(figsize=(8.5, 11))
+    else:
+        fig.clear()
+    
+    if solo_texto:
+        sp = fig.subplotpars
+        area = Bbox.from_extents(sp.left, sp.bottom, sp.right, sp.top)
+        return fig, partial(fig.text, transform=BboxTransformTo(TransformedBbox(area, fig.transFigure))), propia
+    return fig, fig.add_subplot(), propia
+
+
+def _terminar_pagina(pdf, fig, propia, recortar=False, **kwargs):
+    """
+    Guarda la página en el PDF y cierra la figura si no es la compartida.
+    
+    Las páginas de texto tienen diseño fijo y se guardan tal cual (tamaño
+    carta). recortar=True usa bbox_inches='tight', que dibuja la figura una
+    vez de más para medirla; solo lo usan las páginas con imágenes, cuyo
+    tamaño varía.
+    """
+    if recortar:
+        kwargs['bbox_inches'] = 'tight'
+    pdf.savefig(fig, **kwargs)
+    if propia:
+        plt.close(fig)
+
+
+def crear_portada(pdf, indice, fig=None, info=None, ts=None):
+    """Crea portada del reporte (info y ts los calcula generar_reporte_pdf)."""
+    info = info if info is not None else INDICES_INFO[indice]
+    ts = ts if ts is not None else datetime.now()
+    
+    fig, texto, propia = _nueva_pagina(fig, solo_texto=True)
     fig.patch.set_facecolor('white')
     
     # Título principal
-    plt.text(0.5, 0.7, 'REPORTE DE ANÁLISIS', 
+    texto(0.5, 0.7, 'REPORTE DE ANÁLISIS', 
              ha='center', va='center', fontsize=32, fontweight='bold')
     
-    plt.text(0.5, 0.62, f'{INDICES_INFO[indice]["nombre"]}',
+    texto(0.5, 0.62, f'{info["nombre"]}',
              ha='center', va='center', fontsize=24, color='#2E86AB')
     
-    plt.text(0.5, 0.55, f'({indice})',
+    texto(0.5, 0.55, f'({indice})',
              ha='center', va='center', fontsize=18, color='gray')
     
     # Información
-    plt.text(0.5, 0.4, 'Análisis Espacial y Temporal de Vegetación',
+    texto(0.5, 0.4, 'Análisis Espacial y Temporal de Vegetación',
              ha='center', va='center', fontsize=14)
     
-    plt.text(0.5, 0.35, 'UPIITA - Instituto Politécnico Nacional',
+    texto(0.5, 0.35, 'UPIITA - Instituto Politécnico Nacional',
              ha='center', va='center', fontsize=12, style='italic')
     
     # Fecha
-    plt.text(0.5, 0.2, f'Generado: {datetime.now().strftime("%d de %B de %Y")}',
+    texto(0.5, 0.2, f'Generado: {ts.strftime("%d de %B de %Y")}',
              ha='center', va='center', fontsize=10, color='gray')
     
-    plt.axis('off')
-    pdf.savefig(fig, bbox_inches='tight')
-    plt.close()
+    _terminar_pagina(pdf, fig, propia)
 
 
-def agregar_seccion(pdf, titulo):
+def agregar_seccion(pdf, titulo, fig=None):
     """Agrega página de separación de sección (simplificada)."""
-    fig, ax = plt.subplots(figsize=(8.5, 11))
+    fig, _, propia = _nueva_pagina(fig, solo_texto=True)
     fig.patch.set_facecolor('#F5F5F5')
-    ax.set_facecolor('#F5F5F5')
-    
-    # Título centrado
-    ax.text(0.5, 0.5, titulo,
-            ha='center', va='center', fontsize=28, fontweight='bold',
-            color='#2E86AB', transform=ax.transAxes)
     
-    # Ocultar todos los ejes y bordes
-    ax.set_xlim(0, 1)
-    ax.set_ylim(0, 1)
-    ax.axis('off')
-    ax.set_frame_on(False)
+    # Título centrado en la página
+    fig.text(0.5, 0.5, titulo,
+             ha='center', va='center', fontsize=28, fontweight='bold',
+             color='#2E86AB')
     
-    plt.tight_layout()
-    pdf.savefig(fig, bbox_inches='tight', facecolor='#F5F5F5')
-    plt.close(fig)
+    _terminar_pagina(pdf, fig, propia, facecolor='#F5F5F5')
+
+
+# Interlineado de los bloques de texto del resumen (misma separación que
+# tenían las líneas cuando se dibujaban una por una)
+ESPACIADO_LINEAS_RESUMEN = 2.5
+ESPACIADO_LINEAS_EXPLICACION = 2.2
+# Con va='top' el interlineado también desplaza la primera línea hacia abajo;
+# este ajuste la devuelve a la altura donde estaba
+AJUSTE_BLOQUE_RESUMEN = 0.012
 
 
-def agregar_resumen_ejecutivo(pdf, indice):
+def agregar_resumen_ejecutivo(pdf, indice, csvs_escaneados=None, fig=None, info=None):
     """Agrega página con resumen ejecutivo."""
-    fig = plt.figure(figsize=(8.5, 11))
+    if csvs_escaneados is None:
+        csvs_escaneados = _escanear_csvs()
+    info = info if info is not None else INDICES_INFO[indice]
+    
+    fig, texto, propia = _nueva_pagina(fig, solo_texto=True)
     fig.patch.set_facecolor('white')
     
     # Título
-    plt.text(0.5, 0.95, 'RESUMEN EJECUTIVO',
+    texto(0.5, 0.95, 'RESUMEN EJECUTIVO',
              ha='center', va='top', fontsize=20, fontweight='bold')
     
     # Buscar archivos de tendencia lineal (nombre correcto)
-    archivos = list(RUTA_REPORTES.glob(f"03_temporal/tendencia_lineal_{indice}_*.csv"))
+    archivos = _buscar_csvs(csvs_escaneados, '03_temporal', indice,
+                            f"tendencia_lineal_{indice}_*.csv")
     
     if archivos:
-        df = pd.read_csv(archivos[-1])  # Más reciente
+        fila, n_filas = _leer_primera_fila_csv(archivos[-1])  # Más reciente
         
         y_pos = 0.85
         
         # Información general
-        plt.text(0.1, y_pos, f'Índice analizado: {INDICES_INFO[indice]["nombre"]}',
+        texto(0.1, y_pos, f'Índice analizado: {info["nombre"]}',
                  ha='left', va='top', fontsize=12, fontweight='bold')
         y_pos -= 0.05
         
-        plt.text(0.1, y_pos, f'Total de imágenes: {len(df)}',
+        texto(0.1, y_pos, f'Total de imágenes: {n_filas}',
                  ha='left', va='top', fontsize=10)
         y_pos -= 0.05
         
         # Buscar info de período en archivo de estadísticas exploratorias
-        archivos_exp = list(RUTA_REPORTES.glob(f"01_exploratorio/analisis_exploratorio_{indice}_*.csv"))
+        archivos_exp = _buscar_csvs(csvs_escaneados, '01_exploratorio', indice,
+                                    f"analisis_exploratorio_{indice}_*.csv")
         if archivos_exp:
-            df_exp = pd.read_csv(archivos_exp[-1])
-            if 'fecha' in df_exp.columns and len(df_exp) > 1:
-                plt.text(0.1, y_pos, f'Período: {df_exp["fecha"].iloc[0]} a {df_exp["fecha"].iloc[-1]}',
+            # Solo se usa la columna de fechas (como texto, sin inferir tipos)
+            if 'fecha' in _leer_csv(archivos_exp[-1], nrows=0).columns:
+                df_exp = _leer_csv(archivos_exp[-1], usecols=['fecha'], dtype={'fecha': str})
+            else:
+                df_exp = None
+            if df_exp is not None and len(df_exp) > 1:
+                texto(0.1, y_pos, f'Período: {df_exp["fecha"].iloc[0]} a {df_exp["fecha"].iloc[-1]}',
                          ha='left', va='top', fontsize=10)
                 y_pos -= 0.05
-                plt.text(0.1, y_pos, f'Total de imágenes analizadas: {len(df_exp)}',
+                texto(0.1, y_pos, f'Total de imágenes analizadas: {len(df_exp)}',
                          ha='left', va='top', fontsize=10)
                 y_pos -= 0.08
         
         # Resultados de tendencia
-        plt.text(0.1, y_pos, 'RESULTADOS DE TENDENCIA TEMPORAL:',
+        texto(0.1, y_pos, 'RESULTADOS DE TENDENCIA TEMPORAL:',
                  ha='left', va='top', fontsize=12, fontweight='bold')
         y_pos -= 0.05
         
-        if 'pendiente' in df.columns:
-            pendiente = df['pendiente'].iloc[0]
-            r2 = df['r2'].iloc[0] if 'r2' in df.columns else df.get('r_cuadrado', [0]).iloc[0]
-            p_valor = df['p_valor'].iloc[0]
+        if 'pendiente' in fila:
+            pendiente = _a_float(fila['pendiente'])
+            r2 = _a_float(fila['r2'] if 'r2' in fila else fila.get('r_cuadrado', 0))
+            p_valor = _a_float(fila['p_valor'])
             
             # Interpretación
             if p_valor < 0.05:
@@ -149,7 +322,7 @@ def agregar_resumen_ejecutivo(pdf, indice):
                 tendencia = "DECRECIENTE (Deteriorando)"
                 color_tend = 'red'
             
-            plt.text(0.1, y_pos, f'• Tendencia: {tendencia}',
+            texto(0.1, y_pos, f'• Tendencia: {tendencia}',
                      ha='left', va='top', fontsize=11, color=color_tend, fontweight='bold')
             y_pos -= 0.04
             
@@ -159,13 +332,12 @@ def agregar_resumen_ejecutivo(pdf, indice):
             else:
                 pendiente_str = f'{pendiente:.4f}'
             
-            plt.text(0.1, y_pos, f'• Pendiente: {pendiente_str} unidades/día',
-                     ha='left', va='top', fontsize=10)
-            y_pos -= 0.04
-            
-            plt.text(0.1, y_pos, f'• R² = {r2:.2f} ({r2*100:.0f}% de varianza explicada)',
-                     ha='left', va='top', fontsize=10)
-            y_pos -= 0.04
+            # Pendiente y R² tienen el mismo estilo: un solo bloque de texto
+            texto(0.1, y_pos + AJUSTE_BLOQUE_RESUMEN,
+                    f'• Pendiente: {pendiente_str} unidades/día\n'
+                    f'• R² = {r2:.2f} ({r2*100:.0f}% de varianza explicada)',
+                    ha='left', va='top', fontsize=10, linespacing=ESPACIADO_LINEAS_RESUMEN)
+            y_pos -= 0.08
             
             # Formatear p-valor
             if p_valor < 0.001:
@@ -173,43 +345,71 @@ def agregar_resumen_ejecutivo(pdf, indice):
             else:
                 p_valor_str = f'{p_valor:.3f}'
             
-            plt.text(0.1, y_pos, f'• Significancia: {significancia} (p = {p_valor_str})',
+            texto(0.1, y_pos, f'• Significancia: {significancia} (p = {p_valor_str})',
                      ha='left', va='top', fontsize=10, color=color_sig, fontweight='bold')
             y_pos -= 0.06
         
         # Interpretación
-        plt.text(0.1, y_pos, '¿QUÉ SIGNIFICA?',
+        texto(0.1, y_pos, '¿QUÉ SIGNIFICA?',
                  ha='left', va='top', fontsize=12, fontweight='bold')
         y_pos -= 0.04
         
         explicacion = f"""
-El índice {indice} ({INDICES_INFO[indice]['nombre']}) mide: {INDICES_INFO[indice]['descripcion']}
+El índice {indice} ({info['nombre']}) mide: {info['descripcion']}
 
 Durante el período analizado, se observa una tendencia {tendencia.lower()}.
 """
         
-        for linea in explicacion.strip().split('\n'):
-            plt.text(0.1, y_pos, linea.strip(), ha='left', va='top', fontsize=9, wrap=True)
-            y_pos -= 0.03
+        texto(0.1, y_pos + AJUSTE_BLOQUE_RESUMEN, explicacion.strip(),
+                ha='left', va='top', fontsize=9, wrap=True,
+                linespacing=ESPACIADO_LINEAS_EXPLICACION)
     
     else:
-        plt.text(0.5, 0.5, 'No se encontraron datos de análisis temporal',
+        texto(0.5, 0.5, 'No se encontraron datos de análisis temporal',
                  ha='center', va='center', fontsize=12, color='gray')
     
-    plt.xlim(0, 1)
-    plt.ylim(0, 1)
-    plt.axis('off')
-    pdf.savefig(fig, bbox_inches='tight')
-    plt.close()
+    _terminar_pagina(pdf, fig, propia)
 
 
-def agregar_graficas(pdf, indice):
-    """Agrega las gráficas principales al PDF con descripciones detalladas."""
-    carpeta_vis = RUTA_VISUALIZACIONES / indice
+# Resolución de las páginas con imágenes; las de texto quedan vectoriales
+DPI_PAGINA_IMAGEN = 150
+
+# Resolución máxima de las imágenes en el PDF (página carta a DPI_PAGINA_IMAGEN)
+MAX_PIXELES_PAGINA = (int(8.5 * DPI_PAGINA_IMAGEN), int(11 * DPI_PAGINA_IMAGEN))
+
+# PNG más grandes que esto no se incluyen en el PDF
+MAX_BYTES_IMAGEN = 20_000_000
+
+
+def _cargar_imagen(img_path):
+    """
+    Abre un PNG con Pillow como array uint8, reducido al tamaño de la página.
+    
+    plt.imread decodifica a float32 (4 veces más memoria) y el PDF vuelve a
+    convertir esos valores; con uint8 la imagen se embebe tal cual. Las
+    imágenes más grandes que una página a 150 dpi se reducen (LANCZOS), ya
+    que el detalle extra no se ve y solo agranda el PDF.
+    """
+    from PIL import Image
     
-    # Diccionario de descripciones detalladas por tipo de gráfica
-    descripciones = {
-        'serie_temporal': f"""
+    with Image.open(img_path) as imagen:
+        if imagen.mode not in ('RGB', 'RGBA', 'L'):
+            imagen = imagen.convert('RGBA')
+        imagen.thumbnail(MAX_PIXELES_PAGINA, Image.LANCZOS)
+        return np.asarray(imagen)
+
+
+def _cargar_imagen_segura(img_path):
+    """Como _cargar_imagen, pero retorna None si la imagen no se puede leer."""
+    try:
+        return _cargar_imagen(img_path)
+    except Exception:
+        return None
+
+
+# Descripciones detalladas por tipo de gráfica ({indice} se llena por reporte)
+DESCRIPCIONES_GRAFICAS = {
+    'serie_temporal': """
 INTERPRETACIÓN: Esta gráfica muestra cómo ha cambiado el valor promedio del índice {indice} 
 a lo largo del tiempo. Cada punto representa una imagen satelital capturada en una fecha específica.
 
@@ -218,7 +418,7 @@ QUÉ BUSCAR:
 • Variabilidad: ¿Hay picos o caídas bruscas? Pueden indicar eventos climáticos o cambios estacionales
 • Patrón estacional: ¿Se repiten ciclos de subida/bajada? Es normal en vegetación por estaciones
 """,
-        'histograma': f"""
+    'histograma': """
 INTERPRETACIÓN: Este histograma muestra cómo se distribuyen los valores del índice {indice}
 en toda el área de estudio. El eje vertical indica cuántos píxeles tienen cada valor.
 
@@ -227,7 +427,7 @@ QUÉ BUSCAR:
 • Picos múltiples: Pueden indicar diferentes tipos de vegetación o zonas en el área
 • Líneas de media/mediana: Si están juntas, la distribución es simétrica
 """,
-        'boxplot': f"""
+    'boxplot': """
 INTERPRETACIÓN: Los boxplots muestran el rango de valores para cada fecha. La caja representa
 el 50% central de los datos, y los bigotes muestran el rango completo (excluyendo valores atípicos).
 
@@ -236,7 +436,7 @@ QUÉ BUSCAR:
 • Posición vertical: Cajas más arriba = valores más altos de {indice}
 • Puntos aislados: Son valores extremos que se salen del patrón normal
 """,
-        'mapa_calor': f"""
+    'mapa_calor': """
 INTERPRETACIÓN: Este mapa muestra la distribución espacial del índice {indice} en el área de estudio.
 Los colores cálidos (rojos) y fríos (verdes/azules) representan diferentes niveles de vegetación.
 
@@ -245,7 +445,7 @@ QUÉ BUSCAR:
 • Patrones espaciales: ¿Hay gradientes? ¿Zonas claramente diferentes?
 • Hotspots/Coldspots: Puntos muy diferentes al entorno pueden ser áreas de interés
 """,
-        'tendencia': f"""
+    'tendencia': """
 INTERPRETACIÓN: Esta gráfica incluye una línea de tendencia (regresión lineal) que resume
 la dirección general del cambio en el tiempo.
 
@@ -254,7 +454,7 @@ QUÉ BUSCAR:
 • R² (coeficiente de determinación): Valores cercanos a 1.0 indican tendencia fuerte
 • Dispersión: Puntos muy alejados de la línea indican mucha variabilidad
 """,
-        'prediccion': f"""
+    'prediccion': """
 INTERPRETACIÓN: Este gráfico muestra los valores históricos (datos reales) y la proyección
 hacia el futuro basada en patrones identificados por el modelo de inteligencia artificial.
 
@@ -263,98 +463,122 @@ QUÉ BUSCAR:
 • Continuidad: ¿La predicción sigue el patrón histórico o cambia bruscamente?
 • Divergencia: Bandas de confianza que se amplían indican mayor incertidumbre a futuro
 """
-    }
+}
+
+
+# Tipo de gráfica según su nombre de archivo -> clave de DESCRIPCIONES_GRAFICAS.
+# Cada alternativa es un lookahead sobre todo el nombre y se prueban en orden,
+# así que gana la primera palabra clave de la lista (no la que aparece primero
+# en el nombre): 'tendencia_temporal' es una serie temporal.
+PATRON_TIPO_GRAFICA = re.compile(
+    r'(?=.*(?P<serie_temporal>serie|temporal))'
+    r'|(?=.*(?P<histograma>histograma|distribucion))'
+    r'|(?=.*(?P<boxplot>box))'
+    r'|(?=.*(?P<mapa_calor>mapa|espacial|hotspot))'
+    r'|(?=.*(?P<tendencia>tendencia|regresion))'
+    r'|(?=.*(?P<prediccion>prediccion|forecast))',
+    re.DOTALL
+)
+
+
+def agregar_graficas(pdf, indice, fig=None, pngs_por_carpeta=None):
+    """Agrega las gráficas principales al PDF con descripciones detalladas."""
+    if pngs_por_carpeta is None:
+        pngs_por_carpeta = _escanear_pngs(indice)
+    
+    # Descripciones de este índice (se formatean una sola vez por reporte)
+    descripciones = {clave: plantilla.format(indice=indice)
+                     for clave, plantilla in DESCRIPCIONES_GRAFICAS.items()}
     
     # Buscar gráficas por tipo
     tipos_analisis = ['exploratorio', 'temporal', 'espacial', 'prediccion']
     
     for tipo in tipos_analisis:
-        carpeta_tipo = carpeta_vis / tipo
-        
-        if not carpeta_tipo.exists():
+        if not (RUTA_VISUALIZACIONES / indice / tipo).exists():
             continue
         
         # Agregar sección
-        agregar_seccion(pdf, f'ANÁLISIS {tipo.upper()}')
+        agregar_seccion(pdf, f'ANÁLISIS {tipo.upper()}', fig)
+        
+        # Descripción para las gráficas sin tipo reconocido (una vez por tipo)
+        descripcion_general = f"""Esta visualización forma parte del análisis {tipo} del índice {indice}.
+Revise los valores, patrones y tendencias mostradas en la gráfica para identificar
+características importantes de la vegetación en el área de estudio."""
         
         # Buscar imágenes PNG
-        imagenes = sorted(carpeta_tipo.glob('*.png'))
+        imagenes = []
+        for img_path in pngs_por_carpeta.get(tipo, [])[:10]:  # Máximo 10 imágenes por tipo
+            if img_path.stat().st_size >= MAX_BYTES_IMAGEN:
+                print(f"    ⚠ Imagen demasiado grande, se omite: {img_path.name}")
+                continue
+            imagenes.append(img_path)
+        
+        # Decodificar las imágenes de la sección en paralelo (Pillow libera el
+        # GIL); las páginas se dibujan después, en orden, en el mismo PDF
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            imagenes_cargadas = list(executor.map(_cargar_imagen_segura, imagenes))
         
-        for img_path in imagenes[:10]:  # Máximo 10 imágenes por tipo
+        for img_path, img in zip(imagenes, imagenes_cargadas):
             nombre_lower = img_path.stem.lower()
             
             # Para descomposición estacional: mostrar imagen completa sin texto adicional
             if 'descomposicion' in nombre_lower:
-                fig = plt.figure(figsize=(8.5, 11))
-                fig.patch.set_facecolor('white')
-                ax = fig.add_axes([0.02, 0.02, 0.96, 0.96])
-                try:
-                    img = plt.imread(img_path)
-                    ax.imshow(img)
-                except Exception as e:
+                pagina, ax, propia = _nueva_pagina(fig)
+                pagina.patch.set_facecolor('white')
+                ax.set_position([0.02, 0.02, 0.96, 0.96])
+                if img is not None:
+                    ax.imshow(img, interpolation='none', resample=False)
+                else:
                     ax.text(0.5, 0.5, f'Error al cargar imagen', ha='center', va='center')
                 ax.axis('off')
-                pdf.savefig(fig, bbox_inches='tight')
-                plt.close()
+                _terminar_pagina(pdf, pagina, propia, recortar=True, dpi=DPI_PAGINA_IMAGEN)
                 continue
             
             # Para otras imágenes: layout con descripción
-            fig, ax = plt.subplots(figsize=(8.5, 11))
-            fig.patch.set_facecolor('white')
+            pagina, ax, propia = _nueva_pagina(fig)
+            pagina.patch.set_facecolor('white')
             ax.set_facecolor('white')
             
             # Título con nombre del archivo
             titulo = img_path.stem.replace('_', ' ').title()
-            fig.text(0.5, 0.97, titulo,
+            pagina.text(0.5, 0.97, titulo,
                      ha='center', va='top', fontsize=14, fontweight='bold')
             
             # Cargar y mostrar imagen (ajustada para dejar espacio a descripción)
-            try:
-                img = plt.imread(img_path)
+            if img is not None:
                 # Reposicionar el subplot para la imagen
                 ax.set_position([0.05, 0.35, 0.9, 0.58])
-                ax.imshow(img)
-            except Exception as e:
+                ax.imshow(img, interpolation='none', resample=False)
+            else:
                 ax.text(0.5, 0.5, f'Error al cargar imagen', ha='center', va='center')
             
             ax.axis('off')
             ax.set_frame_on(False)
             
             # Agregar descripción detallada según el tipo de gráfica
-            descripcion = "QUÉ MUESTRA ESTA GRÁFICA:\n\n"
-            if 'serie' in nombre_lower or 'temporal' in nombre_lower:
-                descripcion += descripciones['serie_temporal']
-            elif 'histograma' in nombre_lower or 'distribucion' in nombre_lower:
-                descripcion += descripciones['histograma']
-            elif 'boxplot' in nombre_lower or 'box' in nombre_lower:
-                descripcion += descripciones['boxplot']
-            elif 'mapa' in nombre_lower or 'espacial' in nombre_lower or 'hotspot' in nombre_lower:
-                descripcion += descripciones['mapa_calor']
-            elif 'tendencia' in nombre_lower or 'regresion' in nombre_lower:
-                descripcion += descripciones['tendencia']
-            elif 'prediccion' in nombre_lower or 'forecast' in nombre_lower:
-                descripcion += descripciones['prediccion']
-            else:
-                descripcion += f"""Esta visualización forma parte del análisis {tipo} del índice {indice}.
-Revise los valores, patrones y tendencias mostradas en la gráfica para identificar
-características importantes de la vegetación en el área de estudio."""
+            tipo_grafica = PATRON_TIPO_GRAFICA.match(nombre_lower)
+            descripcion = "QUÉ MUESTRA ESTA GRÁFICA:\n\n" + (
+                descripciones[tipo_grafica.lastgroup] if tipo_grafica else descripcion_general)
             
             # Agregar descripción en la parte inferior
-            plt.text(0.05, 0.32, descripcion,
+            ax.text(0.05, 0.32, descripcion,
                      ha='left', va='top', fontsize=8,
-                     transform=fig.transFigure,
+                     transform=pagina.transFigure,
                      wrap=True, family='sans-serif',
                      bbox=dict(boxstyle='round', facecolor='#F8F9FA', alpha=0.8, pad=10))
             
-            pdf.savefig(fig, bbox_inches='tight')
-            plt.close()
+            _terminar_pagina(pdf, pagina, propia, recortar=True, dpi=DPI_PAGINA_IMAGEN)
 
 
-def exportar_resultados_excel(indice):
+def exportar_resultados_excel(indice, csvs_escaneados=None, ts=None):
     """
     Exporta todos los resultados numéricos a archivos Excel y CSV.
     Más accesibles y fáciles de interpretar que tablas en PDF.
     """
+    if csvs_escaneados is None:
+        csvs_escaneados = _escanear_csvs()
+    ts = ts if ts is not None else datetime.now()
+    
     print(f"  • Exportando resultados numéricos a Excel/CSV...")
     
     # Crear carpeta para exportaciones
@@ -373,19 +597,14 @@ def exportar_resultados_excel(indice):
     
     # Intentar crear archivo Excel consolidado
     try:
-        archivo_excel = carpeta_export / f"Resultados_Completos_{indice}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+        archivo_excel = carpeta_export / f"Resultados_Completos_{indice}_{ts.strftime('%Y%m%d')}.xlsx"
         
         with pd.ExcelWriter(archivo_excel, engine='openpyxl') as writer:
             hojas_creadas = 0
             
             for carpeta_nombre, descripcion in carpetas_reportes:
-                ruta_carpeta = RUTA_REPORTES / carpeta_nombre
-                
-                if not ruta_carpeta.exists():
-                    continue
-                
                 # Buscar CSVs de este índice (tomar el más reciente)
-                csvs = sorted(ruta_carpeta.glob(f'*{indice}*.csv'), reverse=True)
+                csvs = _buscar_csvs(csvs_escaneados, carpeta_nombre, indice)[::-1]
                 
                 if not csvs:
                     continue
@@ -403,15 +622,15 @@ def exportar_resultados_excel(indice):
                     tipos_procesados.add(nombre_base)
                     
                     try:
-                        df = pd.read_csv(csv_path)
+                        df = _leer_csv(csv_path)
                         
                         if len(df) == 0:
                             continue
                         
-                        # Formatear números para mejor legibilidad
-                        for col in df.columns:
-                            if df[col].dtype in ['float64', 'float32']:
-                                df[col] = df[col].round(4)
+                        # Formatear números para mejor legibilidad (copia; el
+                        # DataFrame en caché no se modifica)
+                        df = df.round({col: 4 for col in df.columns
+                                       if pd.api.types.is_float_dtype(df[col])})
                         
                         # Nombre de hoja (máximo 31 caracteres para Excel)
                         nombre_hoja = nombre_base[:28].replace('_', ' ').title()
@@ -442,22 +661,17 @@ def exportar_resultados_excel(indice):
     
     # También crear CSVs individuales con nombres descriptivos
     for carpeta_nombre, descripcion in carpetas_reportes:
-        ruta_carpeta = RUTA_REPORTES / carpeta_nombre
-        
-        if not ruta_carpeta.exists():
-            continue
-        
-        csvs = sorted(ruta_carpeta.glob(f'*{indice}*.csv'), reverse=True)
+        csvs = _buscar_csvs(csvs_escaneados, carpeta_nombre, indice)[::-1]
         
         if csvs:
             csv_mas_reciente = csvs[0]
             try:
-                df = pd.read_csv(csv_mas_reciente)
-                if len(df) > 0:
-                    # Guardar copia con nombre más claro
+                if _contar_filas_csv(csv_mas_reciente) > 0:
+                    # Guardar copia con nombre más claro (copia directa del
+                    # archivo, sin parsearlo ni volver a escribirlo con pandas)
                     nombre_nuevo = f"{indice}_{descripcion.replace(' ', '_')}.csv"
                     archivo_csv = carpeta_export / nombre_nuevo
-                    df.to_csv(archivo_csv, index=False)
+                    shutil.copyfile(csv_mas_reciente, archivo_csv)
                     archivos_creados.append(archivo_csv)
             except Exception:
                 continue
@@ -465,24 +679,24 @@ def exportar_resultados_excel(indice):
     return archivos_creados
 
 
-def agregar_tabla_resultados(pdf, indice):
+def agregar_tabla_resultados(pdf, indice, csvs_escaneados=None, fig=None, ts=None):
     """
     Agrega página informativa sobre los resultados numéricos exportados.
     Los datos detallados se exportan a Excel/CSV para mejor accesibilidad.
     """
-    agregar_seccion(pdf, 'RESULTADOS NUMÉRICOS')
+    agregar_seccion(pdf, 'RESULTADOS NUMÉRICOS', fig)
     
     # Exportar resultados a Excel/CSV
-    archivos_exportados = exportar_resultados_excel(indice)
+    archivos_exportados = exportar_resultados_excel(indice, csvs_escaneados, ts)
     
     # Crear página informativa en el PDF
-    fig = plt.figure(figsize=(8.5, 11))
+    fig, texto, propia = _nueva_pagina(fig, solo_texto=True)
     fig.patch.set_facecolor('white')
     
     y_pos = 0.92
     
     # Título
-    plt.text(0.5, y_pos, 'DATOS NUMÉRICOS EXPORTADOS',
+    texto(0.5, y_pos, 'DATOS NUMÉRICOS EXPORTADOS',
              ha='center', va='top', fontsize=18, fontweight='bold')
     y_pos -= 0.08
     
@@ -492,7 +706,7 @@ Excel y CSV para facilitar su análisis y uso en otras aplicaciones.
 
 Estos archivos contienen:"""
     
-    plt.text(0.1, y_pos, explicacion, ha='left', va='top', fontsize=11,
+    texto(0.1, y_pos, explicacion, ha='left', va='top', fontsize=11,
              wrap=True, linespacing=1.5)
     y_pos -= 0.15
     
@@ -505,33 +719,33 @@ Estos archivos contienen:"""
     ]
     
     for titulo, desc in contenidos:
-        plt.text(0.12, y_pos, titulo, ha='left', va='top', fontsize=12, fontweight='bold')
+        texto(0.12, y_pos, titulo, ha='left', va='top', fontsize=12, fontweight='bold')
         y_pos -= 0.03
-        plt.text(0.15, y_pos, desc, ha='left', va='top', fontsize=10, color='#555555')
+        texto(0.15, y_pos, desc, ha='left', va='top', fontsize=10, color='#555555')
         y_pos -= 0.05
     
     y_pos -= 0.05
     
     # Ubicación de archivos
-    plt.text(0.1, y_pos, 'UBICACIÓN DE ARCHIVOS:', ha='left', va='top',
+    texto(0.1, y_pos, 'UBICACIÓN DE ARCHIVOS:', ha='left', va='top',
              fontsize=12, fontweight='bold', color='#2E86AB')
     y_pos -= 0.05
     
     ruta_export = RUTA_REPORTES_PDF / "datos_exportados"
-    plt.text(0.12, y_pos, str(ruta_export), ha='left', va='top',
+    texto(0.12, y_pos, str(ruta_export), ha='left', va='top',
              fontsize=9, family='monospace', color='#333333',
              bbox=dict(boxstyle='round', facecolor='#F0F0F0', alpha=0.8))
     y_pos -= 0.08
     
     # Lista de archivos creados
     if archivos_exportados:
-        plt.text(0.1, y_pos, 'Archivos generados:', ha='left', va='top',
+        texto(0.1, y_pos, 'Archivos generados:', ha='left', va='top',
                  fontsize=11, fontweight='bold')
         y_pos -= 0.04
         
         for archivo in archivos_exportados[:6]:  # Máximo 6
             nombre = archivo.name if hasattr(archivo, 'name') else str(archivo)
-            plt.text(0.12, y_pos, f"• {nombre}", ha='left', va='top', fontsize=9)
+            texto(0.12, y_pos, f"• {nombre}", ha='left', va='top', fontsize=9)
             y_pos -= 0.03
     
     y_pos -= 0.05
@@ -544,176 +758,64 @@ Estos archivos contienen:"""
 
 Los archivos CSV pueden abrirse directamente en Excel haciendo doble clic."""
     
-    plt.text(0.1, y_pos, nota, ha='left', va='top', fontsize=10,
+    texto(0.1, y_pos, nota, ha='left', va='top', fontsize=10,
              bbox=dict(boxstyle='round', facecolor='#E8F5E9', alpha=0.8, pad=0.5),
              linespacing=1.4)
     
-    plt.xlim(0, 1)
-    plt.ylim(0, 1)
-    plt.axis('off')
     
-    pdf.savefig(fig, bbox_inches='tight')
-    plt.close()
+    _terminar_pagina(pdf, fig, propia)
     
     # Ya no agregar tablas embebidas - los datos están en Excel/CSV
     return
 
 
-def _agregar_tabla_resultados_legacy(pdf, indice):
-    """Versión anterior - Ya no se usa, los datos se exportan a Excel."""
-    agregar_seccion(pdf, 'RESULTADOS NUMÉRICOS')
+def _clave_entradas(indice, csvs_escaneados, pngs_por_carpeta):
+    """
+    Huella de las entradas del reporte (CSV y PNG del índice).
     
-    # Buscar CSVs de resultados
-    carpetas_reportes = ['03_temporal', '02_espacial', '01_exploratorio']
+    Cambia si se agrega, borra o modifica cualquiera de los archivos.
+    """
+    entradas = [ruta for carpeta in CARPETAS_CSV
+                for ruta in _buscar_csvs(csvs_escaneados, carpeta, indice)]
+    for pngs in pngs_por_carpeta.values():
+        entradas += pngs
     
-    for carpeta in carpetas_reportes:
-        ruta_carpeta = RUTA_REPORTES / carpeta
-        
-        if not ruta_carpeta.exists():
-            continue
-        
-        # Buscar CSVs de este índice
-        csvs = sorted(ruta_carpeta.glob(f'*{indice}*.csv'))
-        
-        for csv_path in csvs[:5]:  # Máximo 5 tablas por tipo
-            try:
-                df = pd.read_csv(csv_path)
-                
-                # Si está vacío, saltar
-                if len(df) == 0:
-                    continue
-                
-                # Formatear números para mejor legibilidad
-                for col in df.columns:
-                    if df[col].dtype in ['float64', 'float32']:
-                        # Redondear números flotantes a 4 decimales
-                        df[col] = df[col].round(4)
-                
-                # Limitar columnas para que quepa (máximo 7 para buen espaciado)
-                columnas_mostrar = df.columns[:7]
-                df_mostrar = df[columnas_mostrar].copy()
-                
-                # Limitar filas (máximo 25 para evitar tablas muy largas)
-                if len(df_mostrar) > 25:
-                    df_mostrar = df_mostrar.head(25)
-                    nota_truncada = f"(Mostrando primeras 25 de {len(df)} filas)"
-                else:
-                    nota_truncada = ""
-                
-                # Acortar nombres de columnas si son muy largos
-                df_mostrar.columns = [col[:20] + '...' if len(col) > 20 else col 
-                                     for col in df_mostrar.columns]
-                
-                # Crear figura con más espacio
-                fig, ax = plt.subplots(figsize=(8.5, 11))
-                ax.axis('tight')
-                ax.axis('off')
-                
-                # Título
-                titulo = csv_path.stem.replace('_', ' ').title()
-                titulo_y = 0.98 if not nota_truncada else 0.97
-                plt.text(0.5, titulo_y, titulo, ha='center', va='top',
-                         fontsize=13, fontweight='bold', transform=fig.transFigure)
-                
-                if nota_truncada:
-                    plt.text(0.5, 0.94, nota_truncada, ha='center', va='top',
-                             fontsize=9, style='italic', color='gray',
-                             transform=fig.transFigure)
-                
-                # Convertir DataFrame a texto formateado (mejor legibilidad)
-                cell_text = []
-                for idx, row in df_mostrar.iterrows():
-                    row_text = []
-                    for col_name, val in zip(df_mostrar.columns, row):
-                        if pd.isna(val):
-                            row_text.append('-')
-                        elif isinstance(val, (int, np.integer)):
-                            row_text.append(f'{val:,}')
-                        elif isinstance(val, (float, np.floating)):
-                            # Formateo inteligente según el valor y tipo de columna
-                            col_lower = col_name.lower()
-                            abs_val = abs(val)
-                            
-                            # Porcentajes
-                            if 'porcent' in col_lower or '%' in col_lower or 'cv' in col_lower:
-                                row_text.append(f'{val:.1f}%')
-                            # P-valores
-                            elif 'p_valor' in col_lower or 'p-value' in col_lower:
-                                if val < 0.001:
-                                    row_text.append('< 0.001')
-                                else:
-                                    row_text.append(f'{val:.3f}')
-                            # R² o correlaciones
-                            elif 'r_cuadrado' in col_lower or 'r2' in col_lower or 'correlacion' in col_lower:
-                                row_text.append(f'{val:.3f}')
-                            # Valores muy pequeños (usa notación científica)
-                            elif abs_val < 0.0001 and abs_val > 0:
-                                row_text.append(f'{val:.2e}')
-                            # Valores índice típicos (-1 a 1)
-                            elif -1 <= val <= 1:
-                                row_text.append(f'{val:.3f}')
-                            # Valores mayores
-                            elif abs_val >= 1000:
-                                row_text.append(f'{val:,.0f}')
-                            elif abs_val >= 100:
-                                row_text.append(f'{val:.1f}')
-                            else:
-                                row_text.append(f'{val:.2f}')
-                        else:
-                            # Acortar texto si es muy largo
-                            val_str = str(val)
-                            row_text.append(val_str[:25] + '...' if len(val_str) > 25 else val_str)
-                    cell_text.append(row_text)
-                
-                # Crear tabla con mejor formato
-                tabla = ax.table(cellText=cell_text,
-                                colLabels=df_mostrar.columns,
-                                cellLoc='center',
-                                loc='center',
-                                bbox=[0.05, 0.05, 0.9, 0.85])
-                
-                # Configuración de fuente y tamaño
-                tabla.auto_set_font_size(False)
-                tabla.set_fontsize(9)
-                
-                # Ajustar altura de filas para mejor legibilidad
-                tabla.scale(1, 2.0)
-                
-                # Estilo mejorado
-                for (i, j), cell in tabla.get_celld().items():
-                    # Encabezado
-                    if i == 0:
-                        cell.set_facecolor('#2E86AB')
-                        cell.set_text_props(weight='bold', color='white', fontsize=10)
-                        cell.set_height(0.08)
-                    else:
-                        # Filas alternas
-                        if i % 2 == 0:
-                            cell.set_facecolor('#F8F9FA')
-                        else:
-                            cell.set_facecolor('white')
-                        
-                        # Bordes suaves
-                        cell.set_edgecolor('#E0E0E0')
-                        cell.set_linewidth(0.5)
-                
-                # Descripción de la tabla
-                descripcion_tabla = f"""Fuente: {carpeta.replace('_', ' ').title()} | Archivo: {csv_path.name}"""
-                plt.text(0.5, 0.01, descripcion_tabla, ha='center', va='bottom',
-                         fontsize=7, style='italic', color='gray',
-                         transform=fig.transFigure)
-                
-                pdf.savefig(fig, bbox_inches='tight', dpi=150)
-                plt.close()
-                
-            except Exception as e:
-                print(f"ADVERTENCIA: Error al procesar {csv_path.name}: {e}")
-                continue
+    firmas = []
+    for ruta in sorted(entradas):
+        info = ruta.stat()
+        firmas.append((str(ruta), info.st_mtime_ns, info.st_size))
+    return hashlib.sha1(repr(firmas).encode('utf-8')).hexdigest()
+
+
+def _pdf_en_cache(indice, clave):
+    """Retorna el último PDF generado con las mismas entradas, o None."""
+    archivo_cache = RUTA_REPORTES_PDF / f".cache_{indice}.json"
+    try:
+        cache = json.loads(archivo_cache.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    archivo_pdf = Path(cache.get('pdf', ''))
+    if cache.get('clave') == clave and archivo_pdf.is_file():
+        return archivo_pdf
+    return None
+
+
+def _guardar_cache_pdf(indice, clave, archivo_pdf):
+    """Registra qué PDF corresponde a la huella de entradas del índice."""
+    archivo_cache = RUTA_REPORTES_PDF / f".cache_{indice}.json"
+    try:
+        archivo_cache.write_text(json.dumps({'clave': clave, 'pdf': str(archivo_pdf)}),
+                                 encoding='utf-8')
+    except OSError as e:
+        print(f"ADVERTENCIA: No se pudo guardar el caché del PDF: {e}")
 
 
-def generar_reporte_pdf(indice):
+def generar_reporte_pdf(indice, forzar=False):
     """
     Genera reporte PDF completo para un índice.
+    
+    Si ningún CSV ni PNG del índice cambió desde el último PDF, se retorna
+    ese PDF sin regenerarlo (forzar=True lo regenera siempre).
     """
     print(f"\n{'='*80}")
     print(f"GENERANDO REPORTE PDF: {indice}")
@@ -722,36 +824,61 @@ def generar_reporte_pdf(indice):
     # Crear carpeta de PDFs
     RUTA_REPORTES_PDF.mkdir(exist_ok=True, parents=True)
     
+    # Un solo escaneo de las carpetas de reportes para todas las secciones
+    csvs_escaneados = _escanear_csvs()
+    pngs_por_carpeta = _escanear_pngs(indice)
+    
+    # Reutilizar el último PDF si las entradas no cambiaron
+    clave = _clave_entradas(indice, csvs_escaneados, pngs_por_carpeta)
+    if not forzar:
+        archivo_previo = _pdf_en_cache(indice, clave)
+        if archivo_previo is not None:
+            print(f"\n✓ Sin cambios en los resultados; se reutiliza: {archivo_previo.name}")
+            return archivo_previo
+    
+    # Datos del índice y hora de generación: una sola vez para todo el reporte
+    info = INDICES_INFO[indice]
+    ts = datetime.now()
+    ts_str = ts.strftime('%Y%m%d_%H%M%S')
+    
     # Nombre del archivo
-    archivo_pdf = RUTA_REPORTES_PDF / f"Reporte_{indice}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    archivo_pdf = RUTA_REPORTES_PDF / f"Reporte_{indice}_{ts_str}.pdf"
     
     print(f"\nCreando PDF: {archivo_pdf.name}")
     
+    # Una sola figura para todas las páginas (se limpia entre página y página)
+    fig = plt.figure(figsize=(8.5, 11))
+    
+    # Metadata del PDF (se escribe una sola vez al cerrar el archivo)
+    metadata = {
+        'Title': f'Reporte de Análisis - {indice}',
+        'Author': 'Sistema de Análisis de Vegetación - UPIITA',
+        'Subject': f'Análisis de {info["nombre"]}',
+        'Keywords': f'{indice}, vegetación, análisis temporal, análisis espacial',
+        'CreationDate': ts,
+    }
+    
     # Crear PDF
-    with PdfPages(archivo_pdf) as pdf:
+    with PdfPages(archivo_pdf, metadata=metadata) as pdf:
         # 1. Portada
         print("  • Portada")
-        crear_portada(pdf, indice)
+        crear_portada(pdf, indice, fig, info, ts)
         
         # 2. Resumen ejecutivo
         print("  • Resumen ejecutivo")
-        agregar_resumen_ejecutivo(pdf, indice)
+        agregar_resumen_ejecutivo(pdf, indice, csvs_escaneados, fig, info)
         
         # 3. Gráficas
         print("  • Gráficas de análisis")
-        agregar_graficas(pdf, indice)
+        agregar_graficas(pdf, indice, fig, pngs_por_carpeta)
         
         # 4. Tablas
         print("  • Tablas de resultados")
-        agregar_tabla_resultados(pdf, indice)
-        
-        # Metadata del PDF
-        d = pdf.infodict()
-        d['Title'] = f'Reporte de Análisis - {indice}'
-        d['Author'] = 'Sistema de Análisis de Vegetación - UPIITA'
-        d['Subject'] = f'Análisis de {INDICES_INFO[indice]["nombre"]}'
-        d['Keywords'] = f'{indice}, vegetación, análisis temporal, análisis espacial'
-        d['CreationDate'] = datetime.now()
+        agregar_tabla_resultados(pdf, indice, csvs_escaneados, fig, ts)
+    
+    plt.close(fig)
+    
+    _guardar_cache_pdf(indice, clave, archivo_pdf)
     
     print(f"\nPDF generado exitosamente")
     print(f"   Ubicación: {archivo_pdf}")
@@ -760,6 +887,41 @@ def generar_reporte_pdf(indice):
     return archivo_pdf
 
 
+def _generar_reporte_seguro(indice):
+    """Genera el PDF de un índice; retorna (indice, mensaje de error o None)."""
+    try:
+        generar_reporte_pdf(indice)
+        return indice, None
+    except Exception as e:
+        return indice, str(e)
+
+
+def generar_reportes_en_paralelo(indices):
+    """
+    Genera los PDFs de varios índices en procesos separados (hasta 4).
+    
+    Cada PDF es independiente (archivo de salida propio), así que se
+    generan a la vez. Retorna lista de (indice, error o None).
+    """
+    import pickle
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    
+    RUTA_REPORTES_PDF.mkdir(exist_ok=True, parents=True)
+    
+    if len(indices) <= 1:
+        return [_generar_reporte_seguro(indice) for indice in indices]
+    
+    try:
+        with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 4, len(indices))) as executor:
+            return list(executor.map(_generar_reporte_seguro, indices))
+    except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+        # Solo fallos del pool; los errores de cada reporte ya los devuelve
+        # _generar_reporte_seguro
+        print(f"⚠️  No se pudo generar en paralelo ({e}); generando en serie...")
+        return [_generar_reporte_seguro(indice) for indice in indices]
+
+
 # ============================================================================
 # EJECUCIÓN PRINCIPAL
 # ============================================================================
@@ -784,18 +946,15 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Detectar modo automático
-    import os
     modo_automatico = os.environ.get('ANALISIS_AUTOMATICO') == '1'
     
     if modo_automatico:
         # Generar PDFs para todos
         print("\nModo automático: generando PDFs para todos los índices\n")
         
-        for indice in indices_disponibles:
-            try:
-                generar_reporte_pdf(indice)
-            except Exception as e:
-                print(f"ADVERTENCIA: Error al generar PDF para {indice}: {e}")
+        for indice, error in generar_reportes_en_paralelo(indices_disponibles):
+            if error:
+                print(f"ADVERTENCIA: Error al generar PDF para {indice}: {error}")
     
     else:
         # Modo interactivo
@@ -818,11 +977,9 @@ if __name__ == "__main__":
                 break
             
             elif opcion == 'A':
-                for indice in indices_disponibles:
-                    try:
-                        generar_reporte_pdf(indice)
-                    except Exception as e:
-                        print(f"⚠️  Error: {e}")
+                for indice, error in generar_reportes_en_paralelo(indices_disponibles):
+                    if error:
+                        print(f"⚠️  Error: {error}")
             
             elif opcion.isdigit():
                 num = int(opcion) - 1
@@ -9,7 +9,9 @@ descargas/INDICE/carpeta_fecha/valores_pixeles/*.csv
 """
 
 import sys
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # Configuración
@@ -18,10 +20,44 @@ sys.path.append(str(Path(__file__).parent.parent))
 from configuracion.config import RUTA_DESCARGAS
 from analizador_tesis.procesador_base import (
     listar_imagenes_indice,
-    cargar_csv_pixeles
+    cargar_csv_pixeles,
+    cargar_valores_csv
 )
 
 
+@lru_cache(maxsize=None)
+def listar_imagenes(indice):
+    """Imágenes de un índice, listadas una sola vez (no modificar la lista)."""
+    return listar_imagenes_indice(RUTA_DESCARGAS / indice)
+
+
+@lru_cache(maxsize=32)
+def cargar_valores(ruta_csv):
+    """
+    Valores (float32, sin ceros ni NaN) de un CSV de píxeles, leídos una sola vez.
+    
+    Las comparaciones solo usan la media: no se leen las coordenadas, y la
+    primera y la última imagen de cada índice se reutilizan entre ejemplos.
+    Los NaN se descartan aquí para que .mean() coincida con la de pandas.
+    """
+    valores = cargar_valores_csv(ruta_csv, filtrar_ceros=True).astype(np.float32)
+    return valores[~np.isnan(valores)]
+
+
+def estadisticas_valor(valores):
+    """
+    Mínimo, máximo, media y mediana de la columna 'valor' en un solo paso.
+    
+    Trabaja sobre el arreglo float32 (sin NaN, como pandas) en lugar de hacer
+    cuatro llamadas separadas sobre la Serie.
+    """
+    valores = np.asarray(valores, dtype=np.float32)
+    valores = valores[~np.isnan(valores)]
+    if valores.size == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    return valores.min(), valores.max(), valores.mean(dtype=np.float64), np.median(valores)
+
+
 def ejemplo_leer_csv_pixeles(indice="MSAVI"):
     """
     Ejemplo de cómo leer archivos CSV de píxeles.
@@ -31,8 +67,7 @@ def ejemplo_leer_csv_pixeles(indice="MSAVI"):
     print("="*80)
     
     # Listar imágenes del índice
-    ruta_indice = RUTA_DESCARGAS / indice
-    imagenes = listar_imagenes_indice(ruta_indice)
+    imagenes = listar_imagenes(indice)
     
     print(f"\nImágenes encontradas: {len(imagenes)}")
     
@@ -55,11 +90,12 @@ def ejemplo_leer_csv_pixeles(indice="MSAVI"):
             print(f"   Columnas: {list(df.columns)}")
             
             # Estadísticas básicas
+            minimo, maximo, media, mediana = estadisticas_valor(df['valor'].to_numpy())
             print(f"\nEstadísticas del índice {indice}:")
-            print(f"   Mínimo: {df['valor'].min():.4f}")
-            print(f"   Máximo: {df['valor'].max():.4f}")
-            print(f"   Media: {df['valor'].mean():.4f}")
-            print(f"   Mediana: {df['valor'].median():.4f}")
+            print(f"   Mínimo: {minimo:.4f}")
+            print(f"   Máximo: {maximo:.4f}")
+            print(f"   Media: {media:.4f}")
+            print(f"   Mediana: {mediana:.4f}")
             
             # Mostrar primeros píxeles
             print(f"\n📍 Primeros 5 píxeles (sin ceros):")
@@ -81,8 +117,7 @@ def ejemplo_analisis_comparativo():
     print("="*80)
     
     indice = "NDVI"
-    ruta_indice = RUTA_DESCARGAS / indice
-    imagenes = listar_imagenes_indice(ruta_indice)
+    imagenes = listar_imagenes(indice)
     
     if len(imagenes) >= 2:
         # Comparar primera y última imagen
@@ -90,16 +125,16 @@ def ejemplo_analisis_comparativo():
         img2 = imagenes[-1]
         
         if img1['csv_pixeles'] and img2['csv_pixeles']:
-            df1 = cargar_csv_pixeles(img1['csv_pixeles'])
-            df2 = cargar_csv_pixeles(img2['csv_pixeles'])
+            media1 = cargar_valores(img1['csv_pixeles']).mean(dtype=np.float64)
+            media2 = cargar_valores(img2['csv_pixeles']).mean(dtype=np.float64)
             
             print(f"\n📅 Fecha 1: {img1['fecha_str']}")
-            print(f"   Media {indice}: {df1['valor'].mean():.4f}")
+            print(f"   Media {indice}: {media1:.4f}")
             
             print(f"\n📅 Fecha 2: {img2['fecha_str']}")
-            print(f"   Media {indice}: {df2['valor'].mean():.4f}")
+            print(f"   Media {indice}: {media2:.4f}")
             
-            diferencia = df2['valor'].mean() - df1['valor'].mean()
+            diferencia = media2 - media1
             print(f"\n📊 Cambio: {diferencia:+.4f}")
             
             if diferencia > 0:
@@ -123,22 +158,21 @@ if __name__ == "__main__":
     print("="*80)
     
     for indice in indices:
-        ruta_indice = RUTA_DESCARGAS / indice
-        imagenes = listar_imagenes_indice(ruta_indice)
+        imagenes = listar_imagenes(indice)
         
         if len(imagenes) >= 2:
             img1 = imagenes[0]
             img2 = imagenes[-1]
             
             if img1['csv_pixeles'] and img2['csv_pixeles']:
-                df1 = cargar_csv_pixeles(img1['csv_pixeles'])
-                df2 = cargar_csv_pixeles(img2['csv_pixeles'])
+                media1 = cargar_valores(img1['csv_pixeles']).mean(dtype=np.float64)
+                media2 = cargar_valores(img2['csv_pixeles']).mean(dtype=np.float64)
                 
                 print(f"\n📊 {indice}:")
-                print(f"   Fecha inicial: {img1['fecha_str']} → Media: {df1['valor'].mean():.4f}")
-                print(f"   Fecha final:   {img2['fecha_str']} → Media: {df2['valor'].mean():.4f}")
+                print(f"   Fecha inicial: {img1['fecha_str']} → Media: {media1:.4f}")
+                print(f"   Fecha final:   {img2['fecha_str']} → Media: {media2:.4f}")
                 
-                diferencia = df2['valor'].mean() - df1['valor'].mean()
+                diferencia = media2 - media1
                 print(f"   Cambio: {diferencia:+.4f} {'↗ Incremento' if diferencia > 0 else '↘ Decremento'}")
     
     print("\n" + "="*80)
@@ -10,10 +10,16 @@ Uso:
     python ver_resultados.py
 """
 
+import os
 import sys
+import subprocess
+import time
 from pathlib import Path
 import webbrowser
 from datetime import datetime
+from functools import lru_cache
+from html import escape
+from urllib.parse import quote
 
 # Agregar rutas
 sys.path.append(str(Path(__file__).parent))
@@ -25,6 +31,92 @@ from configuracion.config import (
     INDICES_INFO
 )
 
+# Subcarpetas de cada índice que se muestran, en este orden
+TIPOS_ANALISIS = ('exploratorio', 'temporal', 'espacial', 'segmentacion')
+
+# Segundos durante los que se reutilizan los escaneos de carpetas
+SEGUNDOS_CACHE = 30
+
+
+def _periodo_actual():
+    """Período de SEGUNDOS_CACHE en curso (clave de los cachés de escaneo)."""
+    return int(time.monotonic() // SEGUNDOS_CACHE)
+
+
+@lru_cache(maxsize=1)
+def _indices_en_periodo(periodo):
+    """Índices con datos para un período (ver _indices_disponibles)."""
+    return tuple(obtener_indices_disponibles())
+
+
+def _indices_disponibles():
+    """
+    Índices con datos, reutilizados durante SEGUNDOS_CACHE como máximo.
+    
+    obtener_indices_disponibles() recorre la carpeta de descargas; al pasar
+    el período (o tras _limpiar_caches) se vuelve a recorrer.
+    """
+    return _indices_en_periodo(_periodo_actual())
+
+
+def _png_names_sorted(carpeta):
+    """Nombres de los PNG de una carpeta, ordenados (os.scandir, sin Path por archivo)."""
+    with os.scandir(carpeta) as entradas:
+        nombres = [e.name for e in entradas if e.name.endswith('.png') and e.is_file()]
+    nombres.sort()
+    return nombres
+
+
+def _escanear_indice(indice):
+    """
+    Escanea las carpetas de un índice.
+    
+    Returns:
+        dict {tipo: [nombres PNG ordenados]} solo con los tipos que tienen
+        imágenes, o None si la carpeta del índice no existe
+    """
+    carpeta_idx = RUTA_VISUALIZACIONES / indice
+    if not carpeta_idx.exists():
+        return None
+    
+    tipos = {}
+    for tipo in TIPOS_ANALISIS:
+        carpeta_tipo = carpeta_idx / tipo
+        if carpeta_tipo.exists():
+            archivos = _png_names_sorted(carpeta_tipo)
+            if archivos:
+                tipos[tipo] = archivos
+    return tipos
+
+
+@lru_cache(maxsize=1)
+def _escaneo_en_periodo(periodo):
+    """Escaneo de todas las visualizaciones para un período (ver _scan_all)."""
+    escaneo = {}
+    for indice in _indices_disponibles():
+        tipos = _escanear_indice(indice)
+        if tipos is not None:
+            escaneo[indice] = tipos
+    return escaneo
+
+
+def _scan_all():
+    """
+    Escaneo de todas las visualizaciones, compartido por el listado y el
+    reporte HTML: {indice: {tipo: [nombres PNG ordenados]}}.
+    
+    Se reutiliza durante SEGUNDOS_CACHE como máximo, así que un listado
+    seguido del reporte recorre las carpetas una sola vez, y un listado
+    posterior vuelve a ver los archivos nuevos.
+    """
+    return _escaneo_en_periodo(_periodo_actual())
+
+
+def _limpiar_caches():
+    """Descarta los escaneos guardados (el siguiente uso vuelve a recorrer)."""
+    _indices_en_periodo.cache_clear()
+    _escaneo_en_periodo.cache_clear()
+
 
 def listar_visualizaciones(indice=None):
     """Lista todas las visualizaciones disponibles."""
@@ -32,33 +124,28 @@ def listar_visualizaciones(indice=None):
     print("VISUALIZACIONES DISPONIBLES")
     print("="*80)
     
+    escaneo = _scan_all()
     if indice:
-        indices = [indice]
-    else:
-        indices = obtener_indices_disponibles()
+        tipos = escaneo[indice] if indice in escaneo else _escanear_indice(indice)
+        escaneo = {indice: tipos} if tipos is not None else {}
     
     total_archivos = 0
     
-    for idx in indices:
-        carpeta_idx = RUTA_VISUALIZACIONES / idx
-        if not carpeta_idx.exists():
-            continue
+    for idx, tipos in escaneo.items():
+        # Las líneas de cada índice se acumulan y se escriben de una vez
+        nombre = INDICES_INFO[idx]['nombre']
+        buf = [f"\n📊 {idx} - {nombre}", "-" * 80]
         
-        print(f"\n📊 {idx} - {INDICES_INFO[idx]['nombre']}")
-        print("-" * 80)
+        # Listar por tipo de análisis (últimas 3 por nombre)
+        for tipo, archivos in tipos.items():
+            buf.append(f"\n  {tipo.upper()}: {len(archivos)} visualizaciones")
+            for i, nombre in enumerate(archivos[-3:], 1):
+                buf.append(f"    {i}. {nombre}")
+            if len(archivos) > 3:
+                buf.append(f"    ... y {len(archivos)-3} más")
+            total_archivos += len(archivos)
         
-        # Listar por tipo de análisis
-        for tipo in ['exploratorio', 'temporal', 'espacial', 'segmentacion']:
-            carpeta_tipo = carpeta_idx / tipo
-            if carpeta_tipo.exists():
-                archivos = list(carpeta_tipo.glob('*.png'))
-                if archivos:
-                    print(f"\n  {tipo.upper()}: {len(archivos)} visualizaciones")
-                    for i, archivo in enumerate(sorted(archivos)[-3:], 1):  # Últimas 3
-                        print(f"    {i}. {archivo.name}")
-                    if len(archivos) > 3:
-                        print(f"    ... y {len(archivos)-3} más")
-                    total_archivos += len(archivos)
+        sys.stdout.write('\n'.join(buf) + '\n')
     
     print(f"\n{'='*80}")
     print(f"TOTAL: {total_archivos} visualizaciones generadas")
@@ -67,6 +154,16 @@ def listar_visualizaciones(indice=None):
     return total_archivos
 
 
+def _abrir_carpeta(carpeta):
+    """Abre una carpeta en el explorador del sistema, sin pasar por un shell."""
+    if sys.platform == 'win32':
+        os.startfile(str(carpeta))
+    elif sys.platform == 'darwin':
+        subprocess.Popen(['open', str(carpeta)])
+    else:
+        subprocess.Popen(['xdg-open', str(carpeta)])
+
+
 def abrir_carpeta_visualizaciones(indice=None):
     """Abre la carpeta de visualizaciones en el explorador."""
     if indice:
@@ -75,33 +172,20 @@ def abrir_carpeta_visualizaciones(indice=None):
         carpeta = RUTA_VISUALIZACIONES
     
     if carpeta.exists():
-        import subprocess
-        subprocess.Popen(f'explorer "{carpeta}"')
+        _abrir_carpeta(carpeta)
         print(f"\nAbriendo carpeta: {carpeta}")
     else:
         print(f"\nADVERTENCIA: Carpeta no existe: {carpeta}")
 
 
-def generar_reporte_html():
-    """Genera un reporte HTML con todas las visualizaciones."""
-    print("\n" + "="*80)
-    print("GENERANDO REPORTE HTML")
-    print("="*80)
-    
-    indices = obtener_indices_disponibles()
-    
-    if not indices:
-        print("\nADVERTENCIA: No hay índices con visualizaciones")
-        return
-    
-    # Crear HTML
-    html = """<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Reporte de Análisis - Índices de Vegetación</title>
-    <style>
+# ============================================================================
+# PLANTILLAS DEL REPORTE HTML
+# ============================================================================
+# Definidas una sola vez al importar; en cada reporte solo se llenan los
+# campos con str.format (los estilos van aparte porque usan llaves).
+# Los textos variables se escapan con html.escape y las rutas con quote.
+
+ESTILOS_HTML = """
         body {
             font-family: Arial, sans-serif;
             max-width: 1400px;
@@ -169,75 +253,109 @@ def generar_reporte_html():
             margin-top: 40px;
             font-size: 0.9em;
         }
-    </style>
+"""
+
+PLANTILLA_INICIO = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Reporte de Análisis - Índices de Vegetación</title>
+    <style>{estilos}    </style>
 </head>
 <body>
     <h1>Reporte de Análisis de Índices de Vegetación</h1>
     <div class="stats">
-        <p><strong>Fecha de generación:</strong> """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
+        <p><strong>Fecha de generación:</strong> {fecha}</p>
         <p><strong>Proyecto:</strong> Análisis de Áreas Verdes - Tesis UPIITA</p>
     </div>
 """
-    
-    total_imgs = 0
-    
-    for indice in indices:
-        carpeta_idx = RUTA_VISUALIZACIONES / indice
-        if not carpeta_idx.exists():
-            continue
-        
-        html += f"""
+
+PLANTILLA_INDICE = """
     <div class="indice-section">
-        <h2>{indice} - {INDICES_INFO[indice]['nombre']}</h2>
-        <p><strong>Descripción:</strong> {INDICES_INFO[indice]['descripcion']}</p>
-        <p><strong>Rango:</strong> {INDICES_INFO[indice]['rango']}</p>
+        <h2>{indice} - {nombre}</h2>
+        <p><strong>Descripción:</strong> {descripcion}</p>
+        <p><strong>Rango:</strong> {rango}</p>
 """
-        
-        # Procesar cada tipo de análisis
-        for tipo in ['exploratorio', 'temporal', 'espacial', 'segmentacion']:
-            carpeta_tipo = carpeta_idx / tipo
-            if not carpeta_tipo.exists():
-                continue
-            
-            archivos = sorted(carpeta_tipo.glob('*.png'))
-            if not archivos:
-                continue
-            
-            html += f"""
+
+PLANTILLA_TIPO = """
         <div class="analisis-tipo">
-            <h3>{tipo.upper()}</h3>
+            <h3>{tipo}</h3>
             <div class="gallery">
 """
-            
-            for archivo in archivos:
-                # Ruta relativa desde el HTML
-                ruta_relativa = archivo.relative_to(RUTA_VISUALIZACIONES.parent)
-                html += f"""
+
+PLANTILLA_IMAGEN = """
                 <div class="image-container">
-                    <img src="{ruta_relativa.as_posix()}" alt="{archivo.stem}">
-                    <p class="image-title">{archivo.stem}</p>
+                    <img src="{ruta}" alt="{nombre}">
+                    <p class="image-title">{nombre}</p>
                 </div>
 """
-                total_imgs += 1
-            
-            html += """
+
+CIERRE_TIPO = """
             </div>
         </div>
 """
-        
-        html += """
+
+CIERRE_INDICE = """
     </div>
 """
-    
-    html += f"""
+
+PLANTILLA_FIN = """
     <div class="timestamp">
-        <p>Reporte generado automáticamente | Total de visualizaciones: {total_imgs}</p>
+        <p>Reporte generado automáticamente | Total de visualizaciones: {total}</p>
     </div>
 </body>
 </html>
 """
+
+
+def generar_reporte_html():
+    """Genera un reporte HTML con todas las visualizaciones."""
+    print("\n" + "="*80)
+    print("GENERANDO REPORTE HTML")
+    print("="*80)
+    
+    if not _indices_disponibles():
+        print("\nADVERTENCIA: No hay índices con visualizaciones")
+        return
+    
+    escaneo = _scan_all()
+    
+    # Crear HTML (fragmentos en una lista, unidos una sola vez al final)
+    partes = [PLANTILLA_INICIO.format(estilos=ESTILOS_HTML,
+                                      fecha=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))]
+    
+    total_imgs = 0
+    
+    for indice, tipos in escaneo.items():
+        info = INDICES_INFO[indice]
+        minimo, maximo = info['rango_teorico']
+        partes.append(PLANTILLA_INDICE.format(
+            indice=escape(indice),
+            nombre=escape(info['nombre']),
+            descripcion=escape(info['descripcion']),
+            rango=f"{minimo} a {maximo}"))
+        
+        # Procesar cada tipo de análisis
+        for tipo, archivos in tipos.items():
+            partes.append(PLANTILLA_TIPO.format(tipo=tipo.upper()))
+            
+            # Ruta relativa desde el HTML (que vive junto a la carpeta de
+            # visualizaciones), armada como texto sin relative_to
+            prefijo = f"{RUTA_VISUALIZACIONES.name}/{indice}/{tipo}"
+            for nombre in archivos:
+                partes.append(PLANTILLA_IMAGEN.format(ruta=quote(f"{prefijo}/{nombre}"),
+                                                      nombre=escape(nombre[:-4])))
+                total_imgs += 1
+            
+            partes.append(CIERRE_TIPO)
+        
+        partes.append(CIERRE_INDICE)
+    
+    partes.append(PLANTILLA_FIN.format(total=total_imgs))
     
     # Guardar HTML
+    html = ''.join(partes)
     archivo_html = RUTA_VISUALIZACIONES.parent / "reporte_visualizaciones.html"
     archivo_html.write_text(html, encoding='utf-8')
     
@@ -289,27 +407,31 @@ def menu_principal():
         
         elif opcion == '3':
             generar_reporte_html()
+            # El reporte puede seguir a nuevos análisis: escanear de nuevo después
+            _limpiar_caches()
         
         elif opcion == '4':
-            indices = obtener_indices_disponibles()
+            indices = _indices_disponibles()
             print("\nÍndices disponibles:")
             for i, idx in enumerate(indices, 1):
                 print(f"  {i}. {idx}")
             
             num = input("\nSelecciona número: ").strip()
-            if num.isdigit():
+            try:
                 idx_num = int(num) - 1
-                if 0 <= idx_num < len(indices):
-                    listar_visualizaciones(indices[idx_num])
-                    
-                    abrir = input("\n¿Abrir carpeta? (s/n): ").strip().lower()
-                    if abrir == 's':
-                        abrir_carpeta_visualizaciones(indices[idx_num])
+            except ValueError:
+                print("\nADVERTENCIA: Entrada inválida")
+                continue
+            if 0 <= idx_num < len(indices):
+                listar_visualizaciones(indices[idx_num])
+                
+                abrir = input("\n¿Abrir carpeta? (s/n): ").strip().lower()
+                if abrir == 's':
+                    abrir_carpeta_visualizaciones(indices[idx_num])
         
         elif opcion == '5':
             if RUTA_REPORTES.exists():
-                import subprocess
-                subprocess.Popen(f'explorer "{RUTA_REPORTES}"')
+                _abrir_carpeta(RUTA_REPORTES)
                 print(f"\nAbriendo carpeta: {RUTA_REPORTES}")
             else:
                 print(f"\nADVERTENCIA: Carpeta no existe: {RUTA_REPORTES}")
@@ -9,9 +9,23 @@ Revisa:
 - Modo automático implementado
 """
 
+import os
+import re
 import sys
+import pickle
 from pathlib import Path
 import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Marcas del modo automático, buscadas sobre los bytes del archivo
+# (toleran espacios y cualquier tipo de comillas)
+_PAT_MAIN = re.compile(rb'if\s+__name__')
+_PAT_AUTO = re.compile(rb"os\.environ(?:\.get\(|\[)\s*['\"]ANALISIS_AUTOMATICO['\"]")
+
+# Por debajo de este número de archivos el arranque del pool cuesta más que
+# compilar en serie (unos pocos ms por archivo)
+MIN_ARCHIVOS_PARALELO = 100
 
 # Colores para terminal
 class Colors:
@@ -34,16 +48,66 @@ def print_info(msg):
     print(f"{Colors.INFO}ℹ{Colors.END} {msg}")
 
 
-def verificar_sintaxis(archivo):
-    """Verifica que un archivo Python tenga sintaxis correcta."""
+def verificar_script(archivo):
+    """
+    Verifica un script leyéndolo una sola vez.
+    
+    Con los mismos bytes se compila (sintaxis) y se buscan las marcas del
+    modo automático (_PAT_MAIN, _PAT_AUTO), sin decodificar el texto.
+    
+    Returns:
+        dict con 'syntax_ok', 'error', 'auto_ok', 'auto_error' y
+        'usa_variable' (menciona ANALISIS_AUTOMATICO)
+    """
+    resultado = {'syntax_ok': False, 'error': None, 'auto_ok': False,
+                 'auto_error': None, 'usa_variable': False}
     try:
-        with open(archivo, 'r', encoding='utf-8') as f:
-            compile(f.read(), archivo, 'exec')
-        return True, None
+        source = Path(archivo).read_bytes()
+    except Exception as e:
+        resultado['error'] = str(e)
+        return resultado
+    resultado['usa_variable'] = source.find(b'ANALISIS_AUTOMATICO') != -1
+    
+    try:
+        compile(source, str(archivo), 'exec')
     except SyntaxError as e:
-        return False, f"Línea {e.lineno}: {e.msg}"
+        resultado['error'] = f"Línea {e.lineno}: {e.msg}"
+        return resultado
     except Exception as e:
-        return False, str(e)
+        resultado['error'] = str(e)
+        return resultado
+    resultado['syntax_ok'] = True
+    
+    # Verificar que tenga if __name__ == "__main__"
+    if not _PAT_MAIN.search(source):
+        resultado['auto_error'] = "No tiene bloque if __name__"
+    # Verificar que tenga detección de modo automático
+    elif not _PAT_AUTO.search(source):
+        resultado['auto_error'] = "No detecta modo automático"
+    else:
+        resultado['auto_ok'] = True
+    return resultado
+
+
+def verificar_en_paralelo(archivos):
+    """
+    Aplica verificar_script a varios archivos repartiéndolos entre procesos.
+    
+    compile() retiene el GIL, por lo que se usan procesos y no hilos. Con
+    pocos archivos (MIN_ARCHIVOS_PARALELO) o un solo núcleo, o si el pool
+    falla, se verifica en serie.
+    
+    Returns:
+        dict {archivo: resultado de verificar_script}
+    """
+    if len(archivos) < MIN_ARCHIVOS_PARALELO or (os.cpu_count() or 1) < 2:
+        return {a: verificar_script(a) for a in archivos}
+    try:
+        with ProcessPoolExecutor() as ex:
+            resultados = list(ex.map(verificar_script, archivos))
+    except (BrokenProcessPool, pickle.PicklingError, OSError, NotImplementedError):
+        resultados = [verificar_script(a) for a in archivos]
+    return dict(zip(archivos, resultados))
 
 
 def verificar_imports(archivo):
@@ -57,25 +121,6 @@ def verificar_imports(archivo):
         return False, str(e)
 
 
-def verificar_modo_automatico(archivo):
-    """Verifica que el script tenga modo automático implementado."""
-    try:
-        with open(archivo, 'r', encoding='utf-8') as f:
-            contenido = f.read()
-        
-        # Verificar que tenga if __name__ == "__main__"
-        if 'if __name__' not in contenido:
-            return False, "No tiene bloque if __name__"
-        
-        # Verificar que tenga detección de modo automático
-        if "os.environ.get('ANALISIS_AUTOMATICO')" not in contenido:
-            return False, "No detecta modo automático"
-        
-        return True, None
-    except Exception as e:
-        return False, str(e)
-
-
 def main():
     print("""
 ╔═══════════════════════════════════════════════════════════════════════════╗
@@ -87,21 +132,42 @@ def main():
     
     proyecto_root = Path(__file__).parent
     
+    config_path = proyecto_root / "configuracion" / "config.py"
+    inicio_path = proyecto_root / "inicio_analisis.py"
+    scripts_dir = proyecto_root / "scripts"
+    scripts_principales = [
+        "00_validacion_datos.py",
+        "01_analisis_exploratorio.py",
+        "02_analisis_espacial.py",
+        "03_analisis_temporal.py",
+        "04_segmentacion_zonas.py",
+        "05_predicciones_futuras.py",
+        "99_generar_reporte_pdf.py"
+    ]
+    analizador_dir = proyecto_root / "analizador_tesis"
+    modulos = list(analizador_dir.glob("*.py")) if analizador_dir.exists() else []
+    
+    # Todos los archivos se verifican en paralelo; los resultados se
+    # muestran después en el orden de cada sección
+    all_files = [config_path, inicio_path,
+                 *[scripts_dir / n for n in scripts_principales],
+                 *[m for m in modulos if m.name != "__init__.py"]]
+    resultados = verificar_en_paralelo(all_files)
+    
     # 1. Verificar configuración
     print("\n" + "="*80)
     print("1. VERIFICANDO CONFIGURACIÓN")
     print("="*80)
     
-    config_path = proyecto_root / "configuracion" / "config.py"
     if config_path.exists():
         print_ok(f"Archivo de configuración existe: {config_path.name}")
         
         # Verificar sintaxis
-        ok, error = verificar_sintaxis(config_path)
-        if ok:
+        res = resultados[config_path]
+        if res['syntax_ok']:
             print_ok("Sintaxis correcta")
         else:
-            print_error(f"Error de sintaxis: {error}")
+            print_error(f"Error de sintaxis: {res['error']}")
             return
         
         # Importar y verificar variables clave
@@ -146,17 +212,6 @@ def main():
     print("2. VERIFICANDO SCRIPTS PRINCIPALES")
     print("="*80)
     
-    scripts_dir = proyecto_root / "scripts"
-    scripts_principales = [
-        "00_validacion_datos.py",
-        "01_analisis_exploratorio.py",
-        "02_analisis_espacial.py",
-        "03_analisis_temporal.py",
-        "04_segmentacion_zonas.py",
-        "05_predicciones_futuras.py",
-        "99_generar_reporte_pdf.py"
-    ]
-    
     scripts_ok = 0
     scripts_error = 0
     
@@ -170,21 +225,20 @@ def main():
             continue
         
         # Verificar sintaxis
-        ok, error = verificar_sintaxis(script_path)
-        if ok:
+        res = resultados[script_path]
+        if res['syntax_ok']:
             print_ok("  Sintaxis correcta")
         else:
-            print_error(f"  Error de sintaxis: {error}")
+            print_error(f"  Error de sintaxis: {res['error']}")
             scripts_error += 1
             continue
         
         # Verificar modo automático (excepto 00 que es opcional)
         if script_name != "00_validacion_datos.py":
-            ok, error = verificar_modo_automatico(script_path)
-            if ok:
+            if res['auto_ok']:
                 print_ok("  Modo automático implementado")
             else:
-                print_warning(f"  Modo automático: {error}")
+                print_warning(f"  Modo automático: {res['auto_error']}")
         
         scripts_ok += 1
     
@@ -198,21 +252,19 @@ def main():
     print("3. VERIFICANDO MÓDULOS ANALIZADOR_TESIS")
     print("="*80)
     
-    analizador_dir = proyecto_root / "analizador_tesis"
     if analizador_dir.exists():
-        modulos = list(analizador_dir.glob("*.py"))
         modulos_ok = 0
         
         for modulo in modulos:
             if modulo.name == "__init__.py":
                 continue
             
-            ok, error = verificar_sintaxis(modulo)
-            if ok:
+            res = resultados[modulo]
+            if res['syntax_ok']:
                 print_ok(f"{modulo.name}")
                 modulos_ok += 1
             else:
-                print_error(f"{modulo.name}: {error}")
+                print_error(f"{modulo.name}: {res['error']}")
         
         print(f"\nMódulos verificados: {modulos_ok}/{len(modulos)-1}")  # -1 por __init__
     else:
@@ -223,21 +275,17 @@ def main():
     print("4. VERIFICANDO INICIO_ANALISIS.PY")
     print("="*80)
     
-    inicio_path = proyecto_root / "inicio_analisis.py"
     if inicio_path.exists():
         print_ok("Archivo existe")
         
-        ok, error = verificar_sintaxis(inicio_path)
-        if ok:
+        res = resultados[inicio_path]
+        if res['syntax_ok']:
             print_ok("Sintaxis correcta")
         else:
-            print_error(f"Error de sintaxis: {error}")
+            print_error(f"Error de sintaxis: {res['error']}")
         
         # Verificar que establece variable de entorno
-        with open(inicio_path, 'r', encoding='utf-8') as f:
-            contenido = f.read()
-        
-        if "ANALISIS_AUTOMATICO" in contenido:
+        if res['usa_variable']:
             print_ok("Configura variable de entorno ANALISIS_AUTOMATICO")
         else:
             print_warning("No configura variable de entorno")